@@ -1,75 +1,45 @@
 # quiz_app.py
 import streamlit as st
 import random
-import time
 import json
-import requests
 import os
-import base64
-import wave
-import struct
-import math
 import io
-import pandas as pd
-
-# --- Beeper Sound Generation ---
-def generate_beep_sound():
-    """Generates a WAV beep sound in memory and returns it as a Base64 string."""
-    sample_rate = 44100
-    duration_s = 0.5
-    freq_hz = 880.0
-    n_samples = int(sample_rate * duration_s)
-    amplitude = 32767 * 0.5
-
-    wav_data = bytearray()
-    for i in range(n_samples):
-        angle = 2 * math.pi * i * freq_hz / sample_rate
-        sample = int(amplitude * math.sin(angle))
-        wav_data += struct.pack('<h', sample)
-
-    buffer = io.BytesIO()
-    with wave.open(buffer, 'wb') as wf:
-        wf.setnchannels(1)
-        wf.setsampwidth(2)
-        wf.setframerate(sample_rate)
-        wf.writeframes(wav_data)
-    buffer.seek(0)
-    return base64.b64encode(buffer.read()).decode('utf-8')
-
-BEEP_WAV_BASE64 = generate_beep_sound()
+
+from quizzo.lazy import lazy_import
+from quizzo.grading import answer_key, index_answers
+from quizzo.metrics import app_rerun, record_fragment_run, timed
+from quizzo.question_bank import QuestionBankError, cell_text, difficulty_split
+from quizzo.resources import (get_adaptive_sampler, get_beep_wav_base64, get_http_session,
+                              get_question_bank, inject_styles)
+from quizzo.state import QuizzoState
+from quizzo.templates import question_card, timer_parts
+
+# Heavy dependencies are only imported when a question set is generated or exported.
+pd = lazy_import('pandas')
+requests = lazy_import('requests')
+
+# Sections drawn outside the question card fragment; when one of them changes the fragment reruns the whole app.
+PAGE_SECTIONS = ('scoreboard', 'board', 'question')
+TICK_S = 1.0
+
+# Overridable so load tests and offline events can point at a local stub.
+GEMINI_API_URL = os.environ.get(
+    'GEMINI_API_URL',
+    "https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash-latest:generateContent"
+)
 
 
 # --- Session State Initialization ---
 def initialize_session_state():
-    """Sets up the default values for the session state."""
-    defaults = {
-        'mode': 'quiz_master',
-        'questions': [],
-        'num_questions': 18,
-        'available_questions': [],
-        'current_question_index': None,
-        'show_answer': False,
-        'timers': {'x': 20, 'y': 15, 'z': 10},
-        'timer_running': False,
-        'timer_value': 0,
-        'timer_start_time': None,
-        'timer_stage': 'off',
-        'quiz_topic': "",
-        'sound_played': False,
-        'team1_name': "Team A",
-        'team2_name': "Team B",
-        'scores': {"Team A": 0, "Team B": 0},
-        'excel_file': None,
-        'points_awarded': False
-    }
-    for key, value in defaults.items():
-        if key not in st.session_state:
-            st.session_state[key] = value
+    """Creates this session's game state object on the first run."""
+    if 'game' not in st.session_state:
+        st.session_state.game = QuizzoState()
 
 initialize_session_state()
 
 
 # --- Gemini API Integration ---
+@timed()
 def generate_quiz_questions_with_gemini(num_questions, topic, difficulty):
     """Generates quiz questions using the Gemini API with a specific prompt."""
     if num_questions <= 0:
@@ -86,10 +56,10 @@ def generate_quiz_questions_with_gemini(num_questions, topic, difficulty):
     chat_history = [{"role": "user", "parts": [{"text": prompt}]}]
     payload = { "contents": chat_history, "generationConfig": {"responseMimeType": "application/json"} }
     api_key = st.secrets["GEMINI_API_KEY"]
-    api_url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash-latest:generateContent?key={api_key}"
+    api_url = f"{GEMINI_API_URL}?key={api_key}"
     
     try:
-        response = requests.post(api_url, headers={'Content-Type': 'application/json'}, json=payload)
+        response = get_http_session().post(api_url, json=payload)
         response.raise_for_status()
         result = response.json()
         json_string = result["candidates"][0]["content"]["parts"][0]["text"]
@@ -101,25 +71,57 @@ def generate_quiz_questions_with_gemini(num_questions, topic, difficulty):
 # --- Mixed Difficulty Question Generation ---
 def generate_mixed_difficulty_questions(total_questions, topic):
     """Generates a shuffled list of questions with a 30/40/30 easy/medium/hard split."""
-    difficulty_mix = {'Easy': 0.3, 'Medium': 0.4, 'Hard': 0.3}
-    num_easy = int(total_questions * difficulty_mix['Easy'])
-    num_medium = int(total_questions * difficulty_mix['Medium'])
-    num_hard = total_questions - num_easy - num_medium
-
     all_questions = []
     with st.spinner("Generating questions... This may take a moment."):
-        all_questions.extend(generate_quiz_questions_with_gemini(num_easy, topic, "Easy"))
-        all_questions.extend(generate_quiz_questions_with_gemini(num_medium, topic, "Medium"))
-        all_questions.extend(generate_quiz_questions_with_gemini(num_hard, topic, "Hard"))
+        for difficulty, count in difficulty_split(total_questions).items():
+            for qa in generate_quiz_questions_with_gemini(count, topic, difficulty):
+                # Keep topic and difficulty so the exported file can be re-imported into the bank.
+                all_questions.append({**qa, 'topic': topic, 'difficulty': difficulty})
 
     random.shuffle(all_questions)
     return all_questions
 
+# --- Offline Question Bank ---
+@timed()
+def sample_questions_from_bank(total_questions, topic, target_success=None):
+    """Draws a quiz from the local question bank without any network call.
+
+    Uses the 30/40/30 mix, or the adaptive sampler when a target success rate is given.
+    """
+    if target_success is None:
+        questions = get_question_bank().sample(total_questions, topic)
+    else:
+        questions = get_adaptive_sampler().board(total_questions, topic, target_success)
+    return [{key: q[key] for key in ('id', 'question', 'answer', 'topic', 'difficulty')} for q in questions]
+
+def record_question_outcome(question_data, stage):
+    """Feeds a played bank question into the adaptive stats; stage is None when nobody scored."""
+    if question_data.get('id') is not None:
+        get_adaptive_sampler().record(question_data['id'], stage)
+
+def question_bank_panel():
+    """Lets the quiz master import xlsx/CSV/JSONL question files into the local bank."""
+    bank = get_question_bank()
+    with st.expander(f"📚 Local Question Bank ({bank.count()} questions)"):
+        uploaded = st.file_uploader("Import questions", type=['xlsx', 'csv', 'jsonl'],
+                                    help="Needs 'question' and 'answer' columns; 'topic', 'difficulty' and 'tags' are optional.")
+        default_topic = st.text_input("Topic for rows without one", value=st.session_state.game.quiz_topic)
+        if uploaded is not None and st.button("Import into Bank", use_container_width=True):
+            try:
+                imported, skipped = bank.import_file(uploaded.getvalue(), uploaded.name, default_topic=default_topic)
+                st.success(f"Imported {imported} questions" + (f" ({skipped} incomplete rows skipped)." if skipped else "."))
+            except QuestionBankError as e:
+                st.error(f"Could not import {uploaded.name}: {e}")
+        for topic, counts in bank.topics():
+            mix = ", ".join(f"{counts.get(level, 0)} {level}" for level in ('Easy', 'Medium', 'Hard'))
+            st.caption(f"**{topic or 'No topic'}**: {mix}")
+
 # --- Excel File Creation ---
+@timed()
 def create_excel_download(questions):
     """Converts the list of questions to an in-memory Excel file for download."""
     if not questions: return None
-    df = pd.DataFrame(questions)
+    df = pd.DataFrame(questions).drop(columns=['id'], errors='ignore')
     output = io.BytesIO()
     with pd.ExcelWriter(output, engine='openpyxl') as writer:
         df.to_excel(writer, index=False, sheet_name='Quiz Questions')
@@ -127,78 +129,51 @@ def create_excel_download(questions):
 
 
 # --- CSS Styling ---
-st.markdown("""
-<style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;600&display=swap');
-    html, body, [class*="st-"] { font-family: 'Inter', sans-serif; }
-    
-    .stButton>button {
-        transition: all 0.3s ease; border-radius: 8px; border: none;
-        font-weight: 600; color: white; background-color: #F4C430;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-    }
-    .stButton>button:hover { background-color: #FFD700; transform: translateY(-2px); }
-
-    .question-grid-cell button {
-        background-color: #ffffff !important; border: 2px solid #F4C430 !important;
-        color: #333333 !important; font-size: 2rem; font-weight: bold; height: 100px;
-        transition: all 0.2s ease-in-out;
-    }
-    .question-grid-cell button:hover { transform: translateY(-5px); box-shadow: 0 8px 12px rgba(0, 0, 0, 0.2); }
-    .question-grid-cell button:disabled {
-        background-color: #f0f2f6 !important; color: #adc6a0 !important;
-        border-color: #d3d3d3 !important;
-    }
-    
-    .chosen-question-container { text-align: center; }
-    .chosen-question-card {
-        background: linear-gradient(135deg, #FFD700, #F4C430); color: white;
-        border-radius: 16px; padding: 30px; box-shadow: 0 10px 20px rgba(0, 0, 0, 0.2);
-        max-width: 800px; margin: auto;
-    }
-    .chosen-question-text { font-size: 2.5rem; font-weight: 600; word-wrap: break-word; }
-    .chosen-answer-text {
-        font-size: 1.5rem; margin-top: 1rem; background-color: rgba(255, 255, 255, 0.2);
-        padding: 1rem; border-radius: 8px;
-    }
-    .timer-label-text { font-size: 1.2rem; opacity: 0.9; font-weight: 600; }
-    .timer-value-text { font-size: 3rem; font-weight: bold; }
-</style>
-""", unsafe_allow_html=True)
+inject_styles('fonts.css', 'quizzo.css')
 
 
 # --- UI Mode: Quiz Master Setup ---
 def quiz_master_mode():
     """Renders the initial setup screen for the quiz master."""
+    game = st.session_state.game
     st.image("https://placehold.co/800x200/F4C430/ffffff?text=Quizzo+Quiz+Master", use_container_width=True)
     st.markdown("<h2 style='text-align: center;'>Welcome, Quiz Master!</h2>", unsafe_allow_html=True)
-    
+
+    question_source = st.radio("Question Source", ["Generate with Gemini", "Local question bank"], horizontal=True)
+    target_success = None
+    if question_source == "Local question bank":
+        question_bank_panel()
+        if st.checkbox("Adaptive difficulty", help="Pick questions from past results instead of the fixed 30/40/30 mix."):
+            target_success = st.slider("Target success rate", min_value=0.2, max_value=0.9, value=0.6, step=0.05,
+                                       help="Expected share of the points teams win per question.")
+
     with st.form(key='quiz_setup_form'):
-        st.session_state.quiz_topic = st.text_input("Quiz Topic", value=st.session_state.quiz_topic)
+        game.quiz_topic = st.text_input("Quiz Topic", value=game.quiz_topic)
         st.subheader("Enter Team Names")
         col_t1, col_t2 = st.columns(2)
-        with col_t1: st.session_state.team1_name = st.text_input("Team 1 Name", st.session_state.team1_name)
-        with col_t2: st.session_state.team2_name = st.text_input("Team 2 Name", st.session_state.team2_name)
+        with col_t1: game.team1_name = st.text_input("Team 1 Name", game.team1_name)
+        with col_t2: game.team2_name = st.text_input("Team 2 Name", game.team2_name)
 
-        st.session_state.num_questions = st.number_input( 'Total Number of Questions', min_value=3, max_value=30, value=st.session_state.num_questions, step=1 )
+        game.num_questions = st.number_input( 'Total Number of Questions', min_value=3, max_value=30, value=game.num_questions, step=1 )
         
         st.markdown("---")
         st.subheader("Set the Timers (in seconds)")
         col_x, col_y, col_z = st.columns(3)
-        with col_x: st.session_state.timers['x'] = st.number_input('First Timer (3 Pts)', value=20, min_value=1)
-        with col_y: st.session_state.timers['y'] = st.number_input('Second Timer (2 Pts)', value=15, min_value=1)
-        with col_z: st.session_state.timers['z'] = st.number_input('Third Timer (1 Pt)', value=10, min_value=1)
+        with col_x: timer_x = st.number_input('First Timer (3 Pts)', value=20, min_value=1)
+        with col_y: timer_y = st.number_input('Second Timer (2 Pts)', value=15, min_value=1)
+        with col_z: timer_z = st.number_input('Third Timer (1 Pt)', value=10, min_value=1)
+        game.timers = {'x': timer_x, 'y': timer_y, 'z': timer_z}
         
         if st.form_submit_button("Generate & Start Quiz!"):
-            if st.session_state.quiz_topic and st.session_state.team1_name and st.session_state.team2_name:
-                gen_qs = generate_mixed_difficulty_questions(st.session_state.num_questions, st.session_state.quiz_topic)
+            if game.quiz_topic and game.team1_name and game.team2_name:
+                if question_source == "Local question bank":
+                    gen_qs = sample_questions_from_bank(game.num_questions, game.quiz_topic, target_success)
+                else:
+                    gen_qs = generate_mixed_difficulty_questions(game.num_questions, game.quiz_topic)
                 if gen_qs:
-                    st.session_state.questions = gen_qs
-                    st.session_state.num_questions = len(gen_qs)
-                    st.session_state.available_questions = list(range(len(gen_qs)))
-                    st.session_state.scores = {st.session_state.team1_name: 0, st.session_state.team2_name: 0}
-                    st.session_state.excel_file = create_excel_download(gen_qs)
-                    st.session_state.mode = 'ready'
+                    game.load_questions(gen_qs)
+                    game.excel_file = create_excel_download(gen_qs)
+                    game.mode = 'ready'
                     st.rerun()
                 else: st.error("Could not generate questions. Please check the topic and try again.")
             else: st.warning("Please enter a quiz topic and both team names.")
@@ -206,161 +181,177 @@ def quiz_master_mode():
 # --- UI Mode: Edit & Download Screen ---
 def ready_mode():
     """Displays a screen to edit questions and download the file before starting."""
+    game = st.session_state.game
     st.info("📝 Review and edit the generated questions and answers below.")
     st.markdown("### Edit Questions & Answers")
 
     with st.form(key="edit_form"):
-        for i, qa in enumerate(st.session_state.questions):
-            st.text_area(
-                label=f"Question {i+1}",
-                value=qa['question'],
-                key=f"q_edit_{i}"
-            )
-            st.text_input(
-                label=f"Answer {i+1}",
-                value=qa['answer'],
-                key=f"a_edit_{i}"
-            )
-            st.markdown("---")
+        # One table widget instead of a text_area/text_input pair per question.
+        edited = st.data_editor(
+            # Gemini may return numeric answers (1945, 3.14); TextColumns can only edit strings.
+            pd.DataFrame([[cell_text(qa['question']), cell_text(qa['answer'])] for qa in game.questions],
+                         columns=['question', 'answer'], index=range(1, len(game.questions) + 1)),
+            column_config={
+                'question': st.column_config.TextColumn("Question", width='large', required=True),
+                'answer': st.column_config.TextColumn("Answer", required=True),
+            },
+            num_rows='fixed',
+            use_container_width=True,
+            key='questions_editor'
+        )
 
         submitted = st.form_submit_button("Save All Changes")
         if submitted:
-            # Update the main questions list from the widget states
-            for i in range(len(st.session_state.questions)):
-                st.session_state.questions[i]['question'] = st.session_state[f"q_edit_{i}"]
-                st.session_state.questions[i]['answer'] = st.session_state[f"a_edit_{i}"]
+            # Update the main questions list from the edited table
+            for qa, row in zip(game.questions, edited.itertuples(index=False)):
+                qa['question'], qa['answer'] = row.question, row.answer
+            game.touch('board', 'question')
             
             # Regenerate the Excel file with the updated questions
-            st.session_state.excel_file = create_excel_download(st.session_state.questions)
+            game.excel_file = create_excel_download(game.questions)
             st.success("Changes saved! Your download file is updated.")
 
-    if st.session_state.excel_file:
+    if game.excel_file:
         st.download_button(
             label="Download Updated Q&A Excel File",
-            data=st.session_state.excel_file,
-            file_name=f"{st.session_state.quiz_topic.replace(' ', '_')}_quiz_edited.xlsx",
+            data=game.excel_file,
+            file_name=f"{game.quiz_topic.replace(' ', '_')}_quiz_edited.xlsx",
             mime="application/vnd.ms-excel",
             use_container_width=True
         )
     
     if st.button("Proceed to Quiz Board", use_container_width=True):
-        st.session_state.mode = 'quiz'
+        index_answers(game.questions)
+        game.mode = 'quiz'
         st.rerun()
 
 # --- UI Mode: Live Quiz ---
+@timed()
+def render_question_card(game, page_stamp):
+    """Question card with its clock and, once revealed, the answer (one escaped HTML element).
+
+    While a timer runs this is called as a fragment that reruns on its own, so only
+    the card redraws each tick; time running out, or anything else that changes
+    the rest of the page (see PAGE_SECTIONS), reruns the whole app.
+    """
+    record_fragment_run('quizzo')
+    question_data = game.current_question
+
+    def show_card(label, remaining=None):
+        answer = question_data['answer'] if game.show_answer else None
+        st.markdown(question_card(question_data['question'], *timer_parts(label, remaining), answer),
+                    unsafe_allow_html=True)
+
+    if game.timer_running:
+        remaining = game.remaining()
+        if remaining > 0:
+            show_card("Timer", remaining)
+        else:
+            game.stop_timer()
+            show_card("Time's Up!", 0)
+            if not game.sound_played:
+                sound_html = f'<audio autoplay><source src="data:audio/wav;base64,{get_beep_wav_base64()}" type="audio/wav"></audio>'
+                st.markdown(sound_html, unsafe_allow_html=True)
+                game.sound_played = True
+            st.rerun()
+    else:
+        show_card("No Timer Running")
+    if game.stamp(*PAGE_SECTIONS) != page_stamp:
+        st.rerun()
+
+@timed()
 def quiz_mode():
     """Renders the main quiz board and the question display screen."""
-    team1, team2 = st.session_state.team1_name, st.session_state.team2_name
-    score1, score2 = st.session_state.scores.get(team1, 0), st.session_state.scores.get(team2, 0)
+    game = st.session_state.game
+    team1, team2 = game.team1_name, game.team2_name
 
     # Display Scoreboard
-    col1, col2 = st.columns(2)
-    with col1: st.metric(label=f"**{team1}**", value=f"{score1} Points")
-    with col2: st.metric(label=f"**{team2}**", value=f"{score2} Points")
+    for col, team in zip(st.columns(2), game.team_names):
+        with col: st.metric(label=f"**{team}**", value=f"{game.scores.get(team, 0)} Points")
     st.markdown("---")
     
     # Display Question Grid or Selected Question
-    if st.session_state.current_question_index is None:
+    if game.current_question_index is None:
         st.markdown("<h2 style='text-align: center;'>Choose a Question</h2>", unsafe_allow_html=True)
-        cols = st.columns(6)
-        for i in range(st.session_state.num_questions):
+        cols = st.container(key='question-grid').columns(6)
+        for i in range(game.num_questions):
             with cols[i % 6]:
-                st.markdown('<div class="question-grid-cell">', unsafe_allow_html=True)
-                if i in st.session_state.available_questions:
+                if i in game.available_questions:
                     if st.button(f"{i+1}", key=f"q_btn_{i}", use_container_width=True):
-                        st.session_state.current_question_index = i
-                        st.session_state.show_answer = False
-                        st.session_state.sound_played = False
-                        st.session_state.timer_stage = 'off'
-                        st.session_state.points_awarded = False
+                        game.open_question(i)
                         st.rerun()
                 else: st.button("✅", key=f"q_btn_{i}", disabled=True, use_container_width=True)
-                st.markdown('</div>', unsafe_allow_html=True)
     else:
-        q_idx = st.session_state.current_question_index
-        question_data = st.session_state.questions[q_idx]
-
-        # Display Question Card and Timer
-        st.markdown(f"""
-        <div class="chosen-question-container">
-            <div class="chosen-question-card">
-                <div class="chosen-question-text">{question_data['question']}</div>
-        """, unsafe_allow_html=True)
-
-        timer_placeholder, sound_placeholder = st.empty(), st.empty()
-
-        if st.session_state.timer_running:
-            elapsed = time.time() - st.session_state.timer_start_time
-            remaining = st.session_state.timer_value - elapsed
-            if remaining > 0:
-                timer_placeholder.markdown(f'<div class="timer-label-text">Timer</div><div class="timer-value-text">{int(remaining)}s</div>', unsafe_allow_html=True)
-            else:
-                st.session_state.timer_running = False
-                timer_placeholder.markdown(f'<div class="timer-label-text">Time\'s Up!</div><div class="timer-value-text">0s</div>', unsafe_allow_html=True)
-                if not st.session_state.sound_played:
-                    sound_html = f'<audio autoplay><source src="data:audio/wav;base64,{BEEP_WAV_BASE64}" type="audio/wav"></audio>'
-                    sound_placeholder.markdown(sound_html, unsafe_allow_html=True)
-                    st.session_state.sound_played = True
-                st.rerun()
-        else:
-            timer_placeholder.markdown('<div class="timer-label-text">No Timer Running</div><div class="timer-value-text">--</div>', unsafe_allow_html=True)
+        question_data = game.current_question
 
-        st.markdown("</div></div>", unsafe_allow_html=True)
-        
-        if st.session_state.show_answer:
-            st.markdown(f"<div class='chosen-answer-text'>Answer: {question_data['answer']}</div>", unsafe_allow_html=True)
+        # Display Question Card, Timer and Answer (ticks in its own fragment while the timer runs)
+        if game.timer_running:
+            st.fragment(render_question_card, run_every=TICK_S)(game, game.stamp(*PAGE_SECTIONS))
+        else:
+            render_question_card(game, game.stamp(*PAGE_SECTIONS))
+
+        # Typed Answers: graded against the stored answer, the host still awards the points.
+        with st.expander("✍️ Check typed answers", expanded=bool(game.typed_grades)):
+            with st.form(key=f"typed_answers_{game.current_question_index}", clear_on_submit=False):
+                typed = {team: st.text_input(f"{team}'s answer", key=f"typed_{game.current_question_index}_{i}") for i, team in enumerate(game.team_names)}
+                if st.form_submit_button("Check Answers", use_container_width=True):
+                    key = answer_key(str(question_data['answer']))
+                    game.typed_grades = {team: (text, key.grade(text)) for team, text in typed.items() if text.strip()}
+            for team, (text, grade) in game.typed_grades.items():
+                if grade.correct:
+                    st.success(f"{team}: \"{text}\" is correct ({grade.reason}, {grade.score:.0%} match)")
+                elif grade.reason == 'partial':
+                    st.warning(f"{team}: \"{text}\" partly matches the answer, your call")
+                else:
+                    st.error(f"{team}: \"{text}\" is wrong")
 
         # Scoring Logic and Buttons
         def award_points(team_name, points):
-            st.session_state.scores[team_name] += points
-            st.session_state.show_answer = True
-            st.session_state.points_awarded = True
+            game.add_points(team_name, points)
+            game.show_answer = True
+            game.points_awarded = True
+            record_question_outcome(question_data, game.timer_stage)
             st.rerun()
 
-        points_map = {'first_person': 3, 'team': 2, 'opposing_team': 1}
-        points_to_award = points_map.get(st.session_state.timer_stage, 0)
+        points_to_award = game.points_to_award
 
         if points_to_award > 0:
             st.markdown(f"**Award {points_to_award} Points To:**")
             score_col1, score_col2 = st.columns(2)
-            if score_col1.button(f"✅ {team1}", use_container_width=True, disabled=st.session_state.points_awarded):
+            if score_col1.button(f"✅ {team1}", use_container_width=True, disabled=game.points_awarded):
                 award_points(team1, points_to_award)
-            if score_col2.button(f"✅ {team2}", use_container_width=True, disabled=st.session_state.points_awarded):
+            if score_col2.button(f"✅ {team2}", use_container_width=True, disabled=game.points_awarded):
                 award_points(team2, points_to_award)
 
         # Control Buttons
         ctrl_cols = st.columns(4)
         
-        if ctrl_cols[0].button("End Timer", use_container_width=True, disabled=not st.session_state.timer_running):
-            st.session_state.timer_running = False
+        if ctrl_cols[0].button("End Timer", use_container_width=True, disabled=not game.timer_running):
+            game.stop_timer()
             st.rerun()
             
         def start_timer(stage, duration_key):
-            st.session_state.timer_running, st.session_state.sound_played = True, False
-            st.session_state.timer_value = st.session_state.timers[duration_key]
-            st.session_state.timer_start_time = time.time()
-            st.session_state.timer_stage = stage
+            game.start_timer(stage, duration_key)
             st.rerun()
 
-        if st.session_state.timer_stage == 'off':
+        if game.timer_stage == 'off':
             if ctrl_cols[1].button("Start Timer (3 Pts)", use_container_width=True): start_timer('first_person', 'x')
-        elif st.session_state.timer_stage == 'first_person':
+        elif game.timer_stage == 'first_person':
             if ctrl_cols[1].button("Start Timer (2 Pts)", use_container_width=True): start_timer('team', 'y')
-        elif st.session_state.timer_stage == 'team':
+        elif game.timer_stage == 'team':
             if ctrl_cols[1].button("Start Timer (1 Pt)", use_container_width=True): start_timer('opposing_team', 'z')
         
         if ctrl_cols[2].button("Show Answer", use_container_width=True):
-            st.session_state.show_answer = True
-            st.session_state.timer_running = False
+            game.show_answer = True
+            game.stop_timer()
             st.rerun()
 
         if ctrl_cols[3].button("Back to Board", use_container_width=True):
-            if q_idx in st.session_state.available_questions: st.session_state.available_questions.remove(q_idx)
-            st.session_state.current_question_index = None
-            st.rerun()
-
-        if st.session_state.timer_running:
-            time.sleep(1)
+            # A question that was played but never awarded counts as unanswered.
+            question_played = game.timer_stage != 'off' or game.show_answer
+            if question_played and not game.points_awarded:
+                record_question_outcome(question_data, None)
+            game.close_question()
             st.rerun()
 
     if st.button("Reset Quiz (Go to Quiz Master Mode)"):
@@ -371,12 +362,14 @@ def quiz_mode():
 # --- Main App Logic ---
 def main():
     """Main function to control which UI mode to display."""
-    if st.session_state.mode == 'quiz_master':
+    mode = st.session_state.game.mode
+    if mode == 'quiz_master':
         quiz_master_mode()
-    elif st.session_state.mode == 'ready':
+    elif mode == 'ready':
         ready_mode()
-    elif st.session_state.mode == 'quiz':
+    elif mode == 'quiz':
         quiz_mode()
 
 if __name__ == '__main__':
-    main()
+    with app_rerun('quizzo'):
+        main()
\ No newline at end of file
@@ -1,42 +1,20 @@
 # quiz_app.py
 import streamlit as st
-import time
-import base64
-import wave
-import struct
-import math
-import io
 import streamlit.components.v1 as components # New: Import components library
 
+from quizzo.metrics import app_rerun, record_fragment_run, timed
+from quizzo.resources import get_buzzer_server, inject_styles
+from quizzo.state import ScoreMasterState
+from quizzo.templates import TIMES_UP, timer_container, timer_parts, turn_banner
+
+# Sections drawn outside the timer fragment; when one of them changes the fragment reruns the whole app.
+PAGE_SECTIONS = ('scoreboard', 'board', 'question')
+TICK_S = 1.0
+BUZZ_POLL_S = 0.25  # Faster ticks while a buzz round is armed, so a lock stops the clock promptly.
+
 # --- Sound file URL from GitHub (raw .mp3) ---
 GITHUB_SOUND_URL = "https://raw.githubusercontent.com/Arishneel-Narayan/Quizzo/main/times-up-omagod.mp3"
 
-# --- Beeper Sound Generation ---
-def generate_beep_sound():
-    """Generates a WAV beep sound in memory and returns it as a Base64 string."""
-    sample_rate = 44100
-    duration_s = 0.5
-    freq_hz = 880.0
-    n_samples = int(sample_rate * duration_s)
-    amplitude = 32767 * 0.5
-
-    wav_data = bytearray()
-    for i in range(n_samples):
-        angle = 2 * math.pi * i * freq_hz / sample_rate
-        sample = int(amplitude * math.sin(angle))
-        wav_data += struct.pack('<h', sample)
-
-    buffer = io.BytesIO()
-    with wave.open(buffer, 'wb') as wf:
-        wf.setnchannels(1)
-        wf.setsampwidth(2)
-        wf.setframerate(sample_rate)
-        wf.writeframes(wav_data)
-    buffer.seek(0)
-    return base64.b64encode(buffer.read()).decode('utf-8')
-
-BEEP_WAV_BASE64 = generate_beep_sound()
-
 # --- New: Function to reliably play the beep sound ---
 
 def play_github_sound():
@@ -60,108 +38,138 @@ def play_github_sound():
 
 # --- Session State Initialization ---
 def initialize_session_state():
-    """Sets up the default values for the session state."""
-    defaults = {
-        'mode': 'setup',
-        'timers': {'x': 20, 'y': 15, 'z': 5},
-        'timer_running': False,
-        'timer_value': 0,
-        'timer_start_time': None,
-        'timer_stage': 'off',
-        'sound_played': False,
-        'team_names': ["Team A", "Team B", "Team C"],
-        'scores': {"Team A": 0, "Team B": 0, "Team C": 0},
-        'points_awarded': False,
-        'current_team_idx': 0,
-        'display_mode': 'quiz'  # 'quiz' or 'scores'
-    }
-    for key, value in defaults.items():
-        if key not in st.session_state:
-            st.session_state[key] = value
+    """Creates this session's game state object on the first run."""
+    if 'game' not in st.session_state:
+        st.session_state.game = ScoreMasterState()
 
 initialize_session_state()
 
 
 # --- CSS Styling ---
-st.markdown("""
-<style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;700&display=swap');
-    html, body, [class*="st-"] { font-family: 'Inter', sans-serif; }
-    
-    .stButton>button {
-        transition: all 0.3s ease; border-radius: 8px; border: none;
-        font-weight: 600; color: white; background-color: #F4C430;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.1); height: 50px;
-    }
-    .stButton>button:hover { background-color: #FFD700; transform: translateY(-2px); }
-    .stButton>button:disabled {
-        background-color: #d3d3d3 !important;
-        color: #888888 !important;
-        cursor: not-allowed;
-    }
-
-    .timer-container {
-        background: linear-gradient(135deg, #FFD700, #F4C430);
-        color: white;
-        border-radius: 16px;
-        padding: 30px;
-        text-align: center;
-        box-shadow: 0 10px 20px rgba(0, 0, 0, 0.2);
-    }
-    .timer-label-text { font-size: 1.5rem; opacity: 0.9; font-weight: 600; }
-    .timer-value-text { font-size: 5rem; font-weight: 700; line-height: 1.1; }
-</style>
-""", unsafe_allow_html=True)
+inject_styles('fonts.css', 'scoremaster.css')
+
+
+# --- Shared Renderers ---
+def render_scoreboard(game):
+    """Shows one metric per team."""
+    for col, team in zip(st.columns(len(game.team_names)), game.team_names):
+        with col:
+            st.metric(label=f"**{team}**", value=f"{game.scores.get(team, 0)} Points")
+
+
+def open_buzzer_room(game):
+    """Opens this game's buzzer room. Returns False, keeping the reason for the sidebar, if the server cannot start."""
+    try:
+        server = get_buzzer_server()
+    except OSError as e:
+        game.buzz_error = f"Buzzers are off: the buzzer server could not start ({e}). Set QUIZZO_BUZZER_PORT to a free port."
+        return False
+    game.buzz_room, game.buzz_error = server.open_room(game.team_names).id, None
+    return True
+
+
+def close_buzzer_room(game):
+    if game.buzzers_enabled:
+        get_buzzer_server().close_room(game.buzz_room)
+
+
+def poll_buzzer(game, buzzer):
+    """A locked buzz freezes the clock while the winning team answers."""
+    if not buzzer:
+        return
+    result = buzzer.result()
+    if result and result.round_id == game.buzz_round and game.buzz_winner is None:
+        game.buzz_winner, game.buzz_order = result.winner, result.order
+        game.stop_timer()
+
+
+@timed()
+def render_timer(game, buzzer, page_stamp):
+    """The clock. While a timer runs this is called as a fragment that reruns on its own,
+    so only the clock redraws each tick; time running out or a buzz that changes the
+    rest of the page (see PAGE_SECTIONS) reruns the whole app."""
+    record_fragment_run('scoremaster')
+    poll_buzzer(game, buzzer)
+    if game.timer_running:
+        remaining = game.remaining()
+        if remaining > 0:
+            st.markdown(timer_container(*timer_parts("Time Remaining", remaining)), unsafe_allow_html=True)
+        else:
+            game.stop_timer()
+            if buzzer:
+                buzzer.disarm()
+            st.markdown(timer_container(*timer_parts("Time's Up!", 0)), unsafe_allow_html=True)
+            if not game.sound_played:
+                st.markdown(TIMES_UP, unsafe_allow_html=True)
+                play_github_sound()
+                game.sound_played = True
+            st.rerun()
+    else:
+        st.markdown(timer_container(*timer_parts("Timer Off")), unsafe_allow_html=True)
+    if game.stamp(*PAGE_SECTIONS) != page_stamp:
+        st.rerun()
 
 
 # --- UI Mode: Setup Screen ---
 def setup_mode():
     """Renders the initial setup screen for team names and timers."""
+    game = st.session_state.game
     st.image("https://placehold.co/800x200/F4C430/ffffff?text=ScoreMaster", use_container_width=True)
     st.markdown("<h2 style='text-align: center;'>Game Setup</h2>", unsafe_allow_html=True)
     
     with st.form(key='setup_form'):
         st.subheader("Enter Team Names")
         col_t1, col_t2, col_t3 = st.columns(3)
-        team_names = st.session_state.team_names
+        team_names = list(game.team_names)
         with col_t1:
             team_names[0] = st.text_input("Team 1 Name", team_names[0])
         with col_t2:
             team_names[1] = st.text_input("Team 2 Name", team_names[1])
         with col_t3:
             team_names[2] = st.text_input("Team 3 Name", team_names[2])
-        st.session_state.team_names = team_names
+        game.team_names = team_names
 
         st.markdown("---")
         st.subheader("Set the Timers (in seconds)")
         col_x, col_y, col_z = st.columns(3)
-        with col_x: st.session_state.timers['x'] = st.number_input('Timer for 3 Pts', value=20, min_value=1)
-        with col_y: st.session_state.timers['y'] = st.number_input('Timer for 2 Pts', value=15, min_value=1)
+        with col_x: timer_x = st.number_input('Timer for 3 Pts', value=20, min_value=1)
+        with col_y: timer_y = st.number_input('Timer for 2 Pts', value=15, min_value=1)
         with col_z:
-            st.session_state.timers['z'] = st.number_input('Timer for 1 Pt', value=5, min_value=1)
+            timer_z = st.number_input('Timer for 1 Pt', value=5, min_value=1)
+        game.timers = {'x': timer_x, 'y': timer_y, 'z': timer_z}
+
+        st.markdown("---")
+        buzzers = st.checkbox("Use team buzzers (phones on this network, or keyboard keys)", value=game.buzzers_enabled)
 
         if st.form_submit_button("Start Game!"):
-            if all(name.strip() for name in st.session_state.team_names):
-                st.session_state.scores = {name: 0 for name in st.session_state.team_names}
-                st.session_state.current_team_idx = 0
-                st.session_state.mode = 'scoring'
+            if all(name.strip() for name in game.team_names):
+                game.scores = {name: 0 for name in game.team_names}
+                game.current_team_idx = 0
+                game.buzzers_enabled = buzzers and open_buzzer_room(game)
+                game.mode = 'scoring'
                 st.rerun()
             else:
                 st.warning("Please enter all three team names.")
 
 # --- UI Mode: Scoring & Timing Dashboard ---
+@timed()
 def scoring_mode():
     """Renders the main dashboard for scoring and timing."""
-    team_names = st.session_state.team_names
-    scores = st.session_state.scores
-    current_team_idx = st.session_state.current_team_idx
-    current_team = team_names[current_team_idx]
+    game = st.session_state.game
+    team_names = game.team_names
+    current_team_idx = game.current_team_idx
+    current_team = game.current_team
+    buzzer = get_buzzer_server().room(game.buzz_room) if game.buzzers_enabled else None
+
+    if game.buzz_error:
+        st.sidebar.error(game.buzz_error)
+    if buzzer:
+        st.sidebar.markdown(f"**🔔 Buzzers:** open `{buzzer.url}` on each team's phone.")
+        st.sidebar.caption("On a laptop, keys 1-9 pick a team and Space buzzes.")
+        poll_buzzer(game, buzzer)
 
     # --- Display Scoreboard (edit controls handled at bottom) ---
-    cols = st.columns(3)
-    for i, team in enumerate(team_names):
-        with cols[i]:
-            st.metric(label=f"**{team}**", value=f"{scores.get(team, 0)} Points")
+    render_scoreboard(game)
     st.markdown("---")
 
     # ...existing code...
@@ -182,92 +190,82 @@ def scoring_mode():
                 col1, col2 = st.columns([1,1])
                 with col1:
                     if st.button(f"➖", key=f"dec_{team}", use_container_width=True):
-                        st.session_state.scores[team] = max(0, st.session_state.scores[team] - 1)
+                        game.add_points(team, -1)
                         st.rerun()
                 with col2:
                     if st.button(f"➕", key=f"inc_{team}", use_container_width=True):
-                        st.session_state.scores[team] += 1
+                        game.add_points(team, 1)
                         st.rerun()
 
     # --- Show current question stage and team ---
-    stage_map = {
-        'off': 'Ready for Next Question',
-        'first_person': f"{current_team} (3 Points)",
-        'team': f"{current_team} (2 Points)",
-        'opposing_team': f"{team_names[(current_team_idx+1)%3]} & {team_names[(current_team_idx+2)%3]} (1 Point)"
-    }
-    st.markdown(f"<h3 style='text-align:center;'>Current Turn: <span style='color:#F4C430'>{stage_map.get(st.session_state.timer_stage, '')}</span></h3>", unsafe_allow_html=True)
-
-    # --- Display Timer ---
-    st.markdown('<div class="timer-container">', unsafe_allow_html=True)
-    timer_placeholder = st.empty()
-    if st.session_state.timer_running:
-        elapsed = time.time() - st.session_state.timer_start_time
-        remaining = st.session_state.timer_value - elapsed
-        if remaining > 0:
-            timer_placeholder.markdown(f'<div class="timer-label-text">Time Remaining</div><div class="timer-value-text">{int(remaining)}s</div>', unsafe_allow_html=True)
-        else:
-            st.session_state.timer_running = False
-            timer_placeholder.markdown(f'<div class="timer-label-text">Time\'s Up!</div><div class="timer-value-text">0s</div>', unsafe_allow_html=True)
-            if not st.session_state.sound_played:
-                st.markdown("""
-                    <div style='text-align:center; margin: 20px 0;'>
-                        <span style='font-size:2rem; color:#F44336;'>⏰ Time's up!</span><br>
-                        <button id='play-timer-audio-btn' style='margin-top:15px; font-size:1.2rem; background:#F4C430; color:white; border:none; border-radius:8px; padding:12px 32px; cursor:pointer;'>🔊 Play Time's Up Sound</button>
-                    </div>
-                """, unsafe_allow_html=True)
-                play_github_sound()
-                st.session_state.sound_played = True
-            st.rerun()
+    def build_turn_banner():
+        stage_map = {
+            'off': 'Ready for Next Question',
+            'first_person': f"{current_team} (3 Points)",
+            'team': f"{current_team} (2 Points)",
+            'opposing_team': f"{team_names[(current_team_idx+1)%3]} & {team_names[(current_team_idx+2)%3]} (1 Point)"
+        }
+        return turn_banner(stage_map.get(game.timer_stage, ''))
+    st.markdown(build_turn_banner(), unsafe_allow_html=True)
+    if game.buzz_winner:
+        runners_up = ", ".join(f"{team} (+{offset:g} ms)" for team, offset in game.buzz_order[1:])
+        st.success(f"🔔 {game.buzz_winner} buzzed first" + (f" — then {runners_up}" if runners_up else ""))
+
+    # --- Display Timer (ticks in its own fragment while running) ---
+    if game.timer_running:
+        tick = BUZZ_POLL_S if buzzer and game.buzz_round is not None else TICK_S
+        st.fragment(render_timer, run_every=tick)(game, buzzer, game.stamp(*PAGE_SECTIONS))
     else:
-        timer_placeholder.markdown('<div class="timer-label-text">Timer Off</div><div class="timer-value-text">--</div>', unsafe_allow_html=True)
-    st.markdown('</div>', unsafe_allow_html=True)
+        render_timer(game, buzzer, game.stamp(*PAGE_SECTIONS))
     st.markdown("<br>", unsafe_allow_html=True)
 
     # --- Scoring Logic and Buttons ---
     def award_points(team_name, points):
-        st.session_state.scores[team_name] += points
-        st.session_state.points_awarded = True
-        st.session_state.timer_running = False  # Stop timer immediately
+        game.add_points(team_name, points)
+        game.points_awarded = True
+        game.stop_timer()  # Stop timer immediately
+        game.clear_buzz()
+        if buzzer:
+            buzzer.disarm()
         # Advance to next team if 3-point question, else stay for 2/1-point attempts
-        if st.session_state.timer_stage == 'first_person':
+        if game.timer_stage == 'first_person':
             # After 3-point question, next team gets their 3-point question
-            st.session_state.current_team_idx = (st.session_state.current_team_idx + 1) % 3
-            st.session_state.timer_stage = 'off'
+            game.next_team()
+            game.timer_stage = 'off'
         else:
             # After 2 or 1 point, just reset to off for same team
-            st.session_state.timer_stage = 'off'
+            game.timer_stage = 'off'
         st.rerun()
 
-    points_map = {'first_person': 3, 'team': 2, 'opposing_team': 1}
-    points_to_award = points_map.get(st.session_state.timer_stage, 0)
+    points_to_award = game.points_to_award
 
     if points_to_award > 0:
         st.markdown(f"**Award {points_to_award} Points To:**")
-        if st.session_state.timer_stage == 'first_person':
+        if game.timer_stage == 'first_person':
             # Only current team can get 3 points
             score_cols = st.columns(3)
             for i, team in enumerate(team_names):
                 if i == current_team_idx:
-                    if score_cols[i].button(f"✅ {team}", use_container_width=True, disabled=st.session_state.points_awarded):
+                    if score_cols[i].button(f"✅ {team}", use_container_width=True, disabled=game.points_awarded):
                         award_points(team, points_to_award)
                 else:
                     score_cols[i].button(f"{team}", use_container_width=True, disabled=True)
-        elif st.session_state.timer_stage == 'team':
+        elif game.timer_stage == 'team':
             # Only current team can get 2 points
             score_cols = st.columns(3)
             for i, team in enumerate(team_names):
                 if i == current_team_idx:
-                    if score_cols[i].button(f"✅ {team}", use_container_width=True, disabled=st.session_state.points_awarded):
+                    if score_cols[i].button(f"✅ {team}", use_container_width=True, disabled=game.points_awarded):
                         award_points(team, points_to_award)
                 else:
                     score_cols[i].button(f"{team}", use_container_width=True, disabled=True)
-        elif st.session_state.timer_stage == 'opposing_team':
+        elif game.timer_stage == 'opposing_team':
             # Only the two non-current teams can get 1 point
             score_cols = st.columns(3)
             for i, team in enumerate(team_names):
-                if i != current_team_idx:
-                    if score_cols[i].button(f"✅ {team}", use_container_width=True, disabled=st.session_state.points_awarded):
+                if i != current_team_idx and game.buzz_winner in (None, team):
+                    # With buzzers, only the team that buzzed first may take the steal.
+                    if score_cols[i].button(f"✅ {team}", use_container_width=True, disabled=game.points_awarded):
                         award_points(team, points_to_award)
                 else:
                     score_cols[i].button(f"{team}", use_container_width=True, disabled=True)
@@ -276,11 +274,11 @@ def scoring_mode():
 
     # --- Control Buttons ---
     def start_timer(stage, duration_key):
-        st.session_state.timer_running, st.session_state.sound_played = True, False
-        st.session_state.timer_value = st.session_state.timers[duration_key]
-        st.session_state.timer_start_time = time.time()
-        st.session_state.timer_stage = stage
-        st.session_state.points_awarded = False
+        game.start_timer(stage, duration_key)
+        game.points_awarded = False
+        game.clear_buzz()
+        if buzzer:
+            game.buzz_round = buzzer.arm(game.stage_teams(stage))
         st.rerun()
 
     # --- Organize control buttons into two rows for better UI ---
@@ -288,35 +286,37 @@ def scoring_mode():
     action_cols = st.columns(3)
 
     # First row: Timer controls
-    if st.session_state.timer_stage == 'off':
+    if game.timer_stage == 'off':
         if timer_cols[0].button(f"Start Timer (3 Pts) for {current_team}", use_container_width=True):
             start_timer('first_person', 'x')
-    elif st.session_state.timer_stage == 'first_person':
+    elif game.timer_stage == 'first_person':
         if timer_cols[0].button("Start Timer (2 Pts)", use_container_width=True):
             start_timer('team', 'y')
-    elif st.session_state.timer_stage == 'team':
+    elif game.timer_stage == 'team':
         if timer_cols[0].button("Start Timer (1 Pt)", use_container_width=True):
             start_timer('opposing_team', 'z')
-    if timer_cols[1].button("Stop Timer", use_container_width=True, disabled=not st.session_state.timer_running):
-        st.session_state.timer_running = False
+    if timer_cols[1].button("Stop Timer", use_container_width=True, disabled=not game.timer_running):
+        game.stop_timer()
+        if buzzer:
+            buzzer.disarm()
         st.rerun()
 
     # Second row: Round/Game/Display controls
     if action_cols[0].button("Reset Round", use_container_width=True):
-        st.session_state.timer_stage = 'off'
-        st.session_state.timer_running = False
-        st.session_state.points_awarded = False
+        game.timer_stage = 'off'
+        game.stop_timer()
+        game.points_awarded = False
+        game.clear_buzz()
+        if buzzer:
+            buzzer.disarm()
         st.rerun()
     if action_cols[1].button("Reset Game", use_container_width=True):
+        close_buzzer_room(game)
         st.session_state.clear()
         initialize_session_state()
         st.rerun()
     if action_cols[2].button("Display Scores", use_container_width=True):
-        st.session_state.display_mode = 'scores'
-        st.rerun()
-
-    if st.session_state.timer_running:
-        time.sleep(1)
+        game.display_mode = 'scores'
         st.rerun()
 
     # Ensure beep sound is played at timer end (already handled in timer display logic)
@@ -324,25 +324,22 @@ def scoring_mode():
 # --- Main App Logic ---
 def main():
     """Main function to control which UI mode to display."""
-    if st.session_state.mode == 'setup':
+    game = st.session_state.game
+    if game.mode == 'setup':
         setup_mode()
-    elif st.session_state.mode == 'scoring':
-        if st.session_state.get('display_mode', 'quiz') == 'quiz':
+    elif game.mode == 'scoring':
+        if game.display_mode == 'quiz':
             scoring_mode()
         else:
             # Simple scoreboard view
             st.markdown("<h2 style='text-align:center;'>Current Scores</h2>", unsafe_allow_html=True)
-            team_names = st.session_state.team_names
-            scores = st.session_state.scores
-            cols = st.columns(3)
-            for i, team in enumerate(team_names):
-                with cols[i]:
-                    st.metric(label=f"**{team}**", value=f"{scores.get(team, 0)} Points")
+            render_scoreboard(game)
             st.markdown("<br>", unsafe_allow_html=True)
             if st.button("Back to Quiz Master", key="back_to_quiz_master"):
-                st.session_state.display_mode = 'quiz'
+                game.display_mode = 'quiz'
                 st.rerun()
 
 if __name__ == '__main__':
-    main()
+    with app_rerun('scoremaster'):
+        main()
 
@@ -1,20 +1,16 @@
 import streamlit as st
-import pandas as pd
-import markdown2
 from io import BytesIO
-from docx import Document
-from docx.shared import Pt
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
+import importlib.util
 import tempfile
 import os
 
-try:
-    from docx2pdf import convert as docx2pdf_convert
-    DOCX2PDF_AVAILABLE = True
-except ImportError:
-    DOCX2PDF_AVAILABLE = False
+from quizzo.lazy import lazy_import
+
+# python-docx, markdown2 and pandas are only needed once a document is generated.
+pd = lazy_import('pandas')
+markdown2 = lazy_import('markdown2')
+
+DOCX2PDF_AVAILABLE = importlib.util.find_spec('docx2pdf') is not None
 
 def add_table_to_docx(doc, df):
     table = doc.add_table(rows=1, cols=len(df.columns))
@@ -56,6 +52,8 @@ def markdown_to_docx(doc, md_text):
     return doc
 
 def generate_docx(md_file, csv_file):
+    from docx import Document
+    from docx.shared import Pt
     doc = Document()
     # Set default font
     style = doc.styles['Normal']
@@ -76,6 +74,7 @@ def generate_docx(md_file, csv_file):
 def docx_to_pdf(docx_bytes):
     if not DOCX2PDF_AVAILABLE:
         return None
+    from docx2pdf import convert as docx2pdf_convert
     with tempfile.NamedTemporaryFile(delete=False, suffix='.docx') as tmp_docx:
         tmp_docx.write(docx_bytes.getvalue())
         tmp_docx.flush()
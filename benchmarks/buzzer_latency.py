@@ -0,0 +1,141 @@
+# benchmarks/buzzer_latency.py
+"""Measures buzzer press-to-lock latency with many teams connected at once.
+
+Starts a BuzzerServer on a free port, opens a room for the teams and one
+keep-alive connection per team, and plays a number of rounds in which every team presses within a few
+milliseconds of the others (like a real race to the buzzer).
+
+    python benchmarks/buzzer_latency.py --teams 50 --rounds 100
+    python benchmarks/buzzer_latency.py --teams 200 --window-ms 10 --json
+
+Reported:
+  press_to_lock   server-side time from the first press arriving to the round locking
+                  (the fairness window plus scheduling overhead)
+  host_notified   time from the first press being sent to the host seeing the lock. Like
+                  ScoreMaster's timer fragment, the host polls result() every --poll-ms
+                  (250 ms, BUZZ_POLL_S) from a random phase, so this is mostly the poll
+                  interval; the fragment rerun that redraws the page comes on top
+  press_response  round trip of each /buzz request as seen by the team device
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from load_test import summarize  # noqa: E402
+from quizzo.buzzer import BuzzerServer  # noqa: E402
+
+
+class Team:
+    """One team device holding a persistent HTTP/1.1 connection."""
+
+    def __init__(self, name):
+        self.name = name
+        self.reader = self.writer = None
+
+    async def connect(self, port):
+        self.reader, self.writer = await asyncio.open_connection('127.0.0.1', port)
+
+    async def press(self, room_id, delay_s):
+        await asyncio.sleep(delay_s)
+        body = json.dumps({'team': self.name}).encode('utf-8')
+        start = time.perf_counter()
+        self.writer.write(b"POST /r/%s/buzz HTTP/1.1\r\nHost: bench\r\nContent-Type: application/json\r\n"
+                          b"Content-Length: %d\r\n\r\n" % (room_id.encode('ascii'), len(body)) + body)
+        await self.writer.drain()
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            if line.lower().startswith(b'content-length:'):
+                length = int(line.split(b':', 1)[1])
+        json.loads(await self.reader.readexactly(length))
+        return start, time.perf_counter() - start
+
+    def close(self):
+        self.writer.close()
+
+
+async def poll_host(room, round_id, poll_s):
+    """Polls result() the way ScoreMaster's fragment does; returns the result and when it was seen."""
+    await asyncio.sleep(random.uniform(0, poll_s))
+    while True:
+        result = room.result()
+        if result and result.round_id == round_id:
+            return result, time.perf_counter()
+        await asyncio.sleep(poll_s)
+
+
+async def run_rounds(room, teams, rounds, spread_ms, poll_ms):
+    lock_latency, host_notified, press_response, wrong_winner = [], [], [], 0
+    for _ in range(rounds):
+        round_id = room.arm()
+        delays = {team.name: random.uniform(0, spread_ms / 1000) for team in teams}
+        host = asyncio.ensure_future(asyncio.wait_for(poll_host(room, round_id, poll_ms / 1000), 5))
+        presses = await asyncio.gather(*(team.press(room.id, delays[team.name]) for team in teams))
+        result, seen = await host
+        first_sent = min(start for start, _ in presses)
+        host_notified.append(seen - first_sent)
+        press_response.extend(rtt for _, rtt in presses)
+        lock_latency.append(result.lock_latency_ms / 1000)
+        earliest = min(zip(presses, teams), key=lambda pair: pair[0][0])[1]
+        if result.winner != earliest.name:
+            wrong_winner += 1
+    return {
+        'press_to_lock': summarize(lock_latency),
+        'host_notified': summarize(host_notified),
+        'press_response': summarize(press_response),
+        'winner_not_earliest_sender': wrong_winner,
+    }
+
+
+async def run_benchmark(teams, rounds, window_ms, spread_ms, poll_ms):
+    server = BuzzerServer(host='127.0.0.1', port=0, window_ms=window_ms).start()
+    names = [f"Team {i + 1}" for i in range(teams)]
+    room = server.open_room(names)
+    clients = [Team(name) for name in names]
+    try:
+        await asyncio.gather(*(client.connect(server.port) for client in clients))
+        report = await run_rounds(room, clients, rounds, spread_ms, poll_ms)
+    finally:
+        for client in clients:
+            client.close()
+        server.stop()
+    return {'teams': teams, 'rounds': rounds, 'window_ms': window_ms, 'spread_ms': spread_ms,
+            'poll_ms': poll_ms, **report}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--teams', type=int, default=50, help='Connected team devices.')
+    parser.add_argument('--rounds', type=int, default=50, help='Buzzer rounds to play.')
+    parser.add_argument('--window-ms', type=float, default=20, help='Fairness window before locking.')
+    parser.add_argument('--spread-ms', type=float, default=5, help='Teams press within this many ms of each other.')
+    parser.add_argument('--poll-ms', type=float, default=250, help="Host poll interval (ScoreMaster's BUZZ_POLL_S).")
+    parser.add_argument('--json', action='store_true', help='Emit machine-readable JSON.')
+    args = parser.parse_args()
+
+    report = asyncio.run(run_benchmark(args.teams, args.rounds, args.window_ms, args.spread_ms, args.poll_ms))
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"buzzer: {report['teams']} teams x {report['rounds']} rounds, "
+          f"{report['window_ms']} ms window, presses spread over {report['spread_ms']} ms, "
+          f"host polls every {report['poll_ms']} ms")
+    for key in ('press_to_lock', 'host_notified', 'press_response'):
+        stats = report[key]
+        print(f"  {key:<15} p50 {stats['p50_ms']:>8.2f} ms   p95 {stats['p95_ms']:>8.2f} ms"
+              f"   max {stats['max_ms']:>8.2f} ms   n={stats['count']}")
+    print(f"  winner was not the earliest sender in {report['winner_not_earliest_sender']} round(s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+# benchmarks/gemini_stub.py
+"""Local stand-in for the Gemini generateContent endpoint.
+
+Answers every POST with the number of questions asked for in the prompt, wrapped
+in the same response envelope Quizzo parses. Point the app at it with
+GEMINI_API_URL=http://127.0.0.1:<port>/generate.
+
+    python benchmarks/gemini_stub.py --port 8765 --latency-ms 300
+"""
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PROMPT_PATTERN = re.compile(r"Generate (\d+) quiz questions .* topic of '(.*)' with '(\w+)' difficulty", re.S)
+
+
+def build_questions(count, topic, difficulty):
+    """Returns `count` deterministic question/answer pairs."""
+    return [
+        {'question': f"[{difficulty}] {topic} question {i + 1}?", 'answer': f"Answer {i + 1}"}
+        for i in range(count)
+    ]
+
+
+def make_handler(latency_s):
+    class GeminiStubHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            try:
+                payload = json.loads(self.rfile.read(length))
+                prompt = payload['contents'][0]['parts'][0]['text']
+            except (ValueError, KeyError, IndexError):
+                self.send_error(400)
+                return
+            match = PROMPT_PATTERN.search(prompt)
+            count, topic, difficulty = (int(match[1]), match[2], match[3]) if match else (0, '', '')
+            if latency_s:
+                time.sleep(latency_s)
+
+            text = json.dumps(build_questions(count, topic, difficulty))
+            body = json.dumps({'candidates': [{'content': {'parts': [{'text': text}]}}]}).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return GeminiStubHandler
+
+
+def start_stub(port=0, latency_ms=0):
+    """Starts the stub on a daemon thread and returns (server, base_url)."""
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(latency_ms / 1000))
+    threading.Thread(target=server.serve_forever, name='gemini-stub', daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/generate"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=int, default=0, help='Artificial delay per request.')
+    args = parser.parse_args()
+
+    server, url = start_stub(args.port, args.latency_ms)
+    print(f"Gemini stub listening on {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
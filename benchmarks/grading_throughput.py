@@ -0,0 +1,92 @@
+# benchmarks/grading_throughput.py
+"""Measures how many typed answers per second quizzo.grading can score for one question.
+
+Submissions are generated from each answer with realistic noise: case and
+punctuation changes, dropped articles, one or two typos, extra words, and
+plain wrong answers. Two figures are reported per answer:
+
+  cold   every submission is distinct, so each one runs the full match
+  warm   teams repeat each other's text, so most hits come from the memo
+
+    python benchmarks/grading_throughput.py --submissions 5000
+    python benchmarks/grading_throughput.py --json
+"""
+import argparse
+import json
+import os
+import random
+import string
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from quizzo.grading import AnswerKey  # noqa: E402
+
+ANSWERS = [
+    'Paris', 'The Beatles', 'Albert Einstein', 'Mount Everest', 'United States',
+    'Leonardo da Vinci', 'Photosynthesis', 'Seven', 'Mercury (planet)', 'Pacific Ocean / Pacific',
+]
+DECOYS = ['London', 'Isaac Newton', 'K2', 'Canada', 'Michelangelo', 'Respiration', 'Eight', 'Venus']
+
+
+def noisy(answer, rng):
+    """One plausible typed submission for `answer`."""
+    text = rng.choice(answer.split(' / '))
+    roll = rng.random()
+    if roll < 0.15:
+        return rng.choice(DECOYS)
+    if roll < 0.55:
+        chars = list(text)
+        for _ in range(rng.randint(1, 2)):
+            i = rng.randrange(len(chars))
+            chars[i] = rng.choice(string.ascii_lowercase)
+        text = ''.join(chars)
+    elif roll < 0.7:
+        text = f"{rng.choice(['the', 'its', 'maybe'])} {text}"
+    return rng.choice([text, text.lower(), text.upper(), text + '!', text + '.'])
+
+
+def bench(answer, submissions, repeat_pool, rng):
+    cold = [f"{noisy(answer, rng)} {i}" if rng.random() < 0.5 else noisy(answer, rng) + ' ' * (i % 3)
+            for i in range(submissions)]
+    pool = [noisy(answer, rng) for _ in range(repeat_pool)]
+    warm = [rng.choice(pool) for _ in range(submissions)]
+
+    results = {}
+    for label, texts in (('cold', cold), ('warm', warm)):
+        key = AnswerKey(answer)
+        start = time.perf_counter()
+        grades = key.grade_many(texts)
+        elapsed = time.perf_counter() - start
+        results[label] = {
+            'per_second': round(len(texts) / elapsed),
+            'mean_us': round(elapsed / len(texts) * 1e6, 1),
+            'correct_share': round(sum(g.correct for g in grades) / len(grades), 2),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--submissions', type=int, default=2000, help='Typed answers graded per question.')
+    parser.add_argument('--repeat-pool', type=int, default=50, help='Distinct texts in the warm run.')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--json', action='store_true', help='Emit machine-readable JSON.')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    report = {answer: bench(answer, args.submissions, args.repeat_pool, rng) for answer in ANSWERS}
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"grading: {args.submissions} submissions per answer")
+    for answer, results in report.items():
+        cold, warm = results['cold'], results['warm']
+        print(f"  {answer:<24} cold {cold['per_second']:>8}/s ({cold['mean_us']:>6} us)"
+              f"   warm {warm['per_second']:>8}/s   correct {cold['correct_share']:.0%}")
+
+
+if __name__ == '__main__':
+    main()
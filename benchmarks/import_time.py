@@ -0,0 +1,116 @@
+# benchmarks/import_time.py
+"""Tracks cold-start import cost and warm per-rerun overhead of the Streamlit apps.
+
+Usage:
+    python benchmarks/import_time.py                 # all apps, human readable
+    python benchmarks/import_time.py Quizzo.py --json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_APPS = ['Quizzo.py', 'ScoreMaster.py', 'app.py']
+
+# Executes the app script once in bare mode, the same work Streamlit does on a cold first run.
+COLD_START_SNIPPET = "import runpy, sys; runpy.run_path(sys.argv[1], run_name='__main__')"
+
+
+# --- Cold Start ---
+def parse_importtime(stderr):
+    """Parses `-X importtime` output into {module: cumulative_us} for imports not nested in another."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        try:
+            _, cumulative_us, name = line[len('import time:'):].split('|')
+        except ValueError:
+            continue
+        # Nested imports are indented by two extra spaces per level.
+        if name.startswith('  '):
+            continue
+        modules[name.strip()] = int(cumulative_us)
+    return modules
+
+
+def measure_cold_start(app, repeats):
+    """Runs the app in a fresh interpreter `repeats` times and returns wall-clock and import stats."""
+    wall_ms, runs = [], []
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT, PYTHONDONTWRITEBYTECODE='1')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', COLD_START_SNIPPET, os.path.join(REPO_ROOT, app)],
+            cwd=REPO_ROOT, env=env, capture_output=True, text=True
+        )
+        wall_ms.append((time.perf_counter() - start) * 1000)
+        if proc.returncode != 0:
+            raise RuntimeError(f"{app} failed to start:\n{proc.stderr[-2000:]}")
+        runs.append(parse_importtime(proc.stderr))
+
+    top_level = runs[-1]
+    heaviest = sorted(top_level.items(), key=lambda item: item[1], reverse=True)[:10]
+    return {
+        'wall_ms_median': round(statistics.median(wall_ms), 1),
+        'wall_ms_min': round(min(wall_ms), 1),
+        'import_ms_total': round(sum(top_level.values()) / 1000, 1),
+        'heaviest_imports_ms': {name: round(us / 1000, 1) for name, us in heaviest},
+    }
+
+
+# --- Per-Rerun Overhead ---
+def measure_rerun(app, reruns):
+    """Reruns the app script with warm caches through Streamlit's AppTest harness."""
+    from streamlit.testing.v1 import AppTest
+
+    sys.path.insert(0, REPO_ROOT)
+    at = AppTest.from_file(os.path.join(REPO_ROOT, app), default_timeout=30)
+    at.secrets['GEMINI_API_KEY'] = 'benchmark'
+    at.run()  # First run pays for imports and cache_resource fills.
+
+    timings = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        at.run()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        'rerun_ms_median': round(statistics.median(timings), 2),
+        'rerun_ms_p95': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2),
+    }
+
+
+# --- Main ---
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('apps', nargs='*', default=DEFAULT_APPS, help='App scripts relative to the repo root.')
+    parser.add_argument('--repeats', type=int, default=5, help='Cold starts per app.')
+    parser.add_argument('--reruns', type=int, default=50, help='Warm reruns per app.')
+    parser.add_argument('--json', action='store_true', help='Emit machine-readable JSON for tracking over time.')
+    args = parser.parse_args()
+
+    report = {}
+    for app in args.apps:
+        report[app] = measure_cold_start(app, args.repeats)
+        report[app].update(measure_rerun(app, args.reruns))
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    for app, stats in report.items():
+        print(f"{app}")
+        print(f"  cold start : {stats['wall_ms_median']} ms median ({stats['wall_ms_min']} ms best), "
+              f"{stats['import_ms_total']} ms in imports")
+        print(f"  rerun      : {stats['rerun_ms_median']} ms median, {stats['rerun_ms_p95']} ms p95")
+        for name, ms in stats['heaviest_imports_ms'].items():
+            print(f"    {ms:>8.1f} ms  {name}")
+
+
+if __name__ == '__main__':
+    main()
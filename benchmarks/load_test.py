@@ -0,0 +1,463 @@
+# benchmarks/load_test.py
+"""Drives many concurrent Quizzo / ScoreMaster game rooms against a real Streamlit server.
+
+Each app is started with `streamlit run` in its own process, and every
+simulated room is a separate browser session speaking Streamlit's websocket
+protocol: it renders the element tree the server sends, clicks buttons and
+submits forms by widget id, and fires st.fragment(run_every=...) reruns on the
+schedule the server asks for, like the frontend does. Each room goes through
+setup, timer start/expiry, awarding points and a reset, the same path a host
+clicks through. Quizzo talks to a local Gemini stub instead of the real API.
+
+    python benchmarks/load_test.py --app scoremaster --sessions 20 --rounds 3
+    python benchmarks/load_test.py --app quizzo --sessions 10 --gemini-latency-ms 500 --json
+
+Reported per app:
+  interaction p50/p95  wall time of each click until the app is idle again
+  timer p50/p95        wall time of a timer phase, from Start Timer until the clock has run out,
+                       with the overrun beyond the configured timer length
+  rerun p50/p95        every full script run, from new_session to script_finished
+  fragment p50/p95     every fragment run (the ticking timer), measured the same way
+  cpu / memory         server process CPU seconds and RSS growth divided by sessions
+
+A room fails if the app renders an exception, a script run does not compile, an
+expected button or widget is missing, or a step times out. Tracebacks in the
+server log fail the whole app. Any failure makes the run exit non-zero.
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from gemini_stub import start_stub  # noqa: E402
+
+SCRIPTS = {'scoremaster': 'ScoreMaster.py', 'quizzo': 'Quizzo.py'}
+# ForwardMsg.ScriptFinishedStatus
+FINISHED, COMPILE_ERROR, EARLY_FOR_RERUN, FRAGMENT_FINISHED = 0, 1, 2, 3
+
+
+class RoomError(Exception):
+    """A room could not complete its scenario."""
+
+
+# --- Streamlit Server ---
+class AppServer:
+    """One `streamlit run` process serving an app from a scratch working directory."""
+
+    def __init__(self, script, env):
+        self.workdir = tempfile.mkdtemp(prefix='quizzo-load-')
+        os.makedirs(os.path.join(self.workdir, '.streamlit'))
+        with open(os.path.join(self.workdir, '.streamlit', 'secrets.toml'), 'w') as f:
+            f.write('GEMINI_API_KEY = "load-test"\n')
+        self.port = free_port()
+        self.log_path = os.path.join(self.workdir, 'server.log')
+        self.log = open(self.log_path, 'wb')
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'streamlit', 'run', os.path.join(REPO_ROOT, script),
+             '--server.headless', 'true', '--server.address', '127.0.0.1', '--server.port', str(self.port),
+             '--server.fileWatcherType', 'none', '--server.enableStaticServing', 'true',
+             '--browser.gatherUsageStats', 'false'],
+            cwd=self.workdir, env={**os.environ, **env}, stdout=self.log, stderr=subprocess.STDOUT,
+        )
+
+    @property
+    def url(self):
+        return f"ws://127.0.0.1:{self.port}/_stcore/stream"
+
+    def wait_ready(self, timeout=60):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"streamlit exited with {self.process.returncode}:\n{self.log_text()}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{self.port}/_stcore/health", timeout=1) as response:
+                    if response.status == 200:
+                        return
+            except OSError:
+                time.sleep(0.2)
+        raise RuntimeError(f"streamlit did not become healthy within {timeout}s")
+
+    def cpu_seconds(self):
+        """User + system CPU time of the server process, from /proc."""
+        with open(f"/proc/{self.process.pid}/stat") as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+    def rss_bytes(self):
+        with open(f"/proc/{self.process.pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+    def log_text(self):
+        self.log.flush()
+        with open(self.log_path, encoding='utf-8', errors='replace') as f:
+            return f.read()
+
+    def tracebacks(self):
+        """Tracebacks the server logged: script-thread crashes the sessions may not have seen."""
+        text = self.log_text()
+        return [block.strip() for block in text.split('Traceback (most recent call last):')[1:]]
+
+    def stop(self):
+        self.process.terminate()
+        try:
+            self.process.wait(10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        self.log.close()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+# --- Websocket Session ---
+class Room:
+    """One browser session: keeps the rendered element tree and records every script run."""
+
+    def __init__(self, url, timeout):
+        self.url = url
+        self.timeout = timeout
+        self.ws = None
+        self.elements = {}      # delta path -> (script run id, fragment id, Element)
+        self.auto_reruns = {}   # fragment id -> [interval s, next due on the monotonic clock]
+        self.run_id, self.run_fragments, self.run_started = '', (), 0.0
+        self.pending = False    # a rerun was requested and its script has not finished yet
+        self.errors = []
+        self.failed = False
+        self.samples = []       # (kind, seconds)
+
+    async def open(self):
+        from websockets.asyncio.client import connect
+
+        self.ws = await connect(self.url, subprotocols=['streamlit'], max_size=None, open_timeout=self.timeout)
+        start = time.perf_counter()
+        await self.request()
+        await self.settle()
+        self.samples.append(('interaction', time.perf_counter() - start))
+
+    async def close(self):
+        if self.ws is not None:
+            await self.ws.close()
+
+    async def request(self, widgets=(), fragment_id=''):
+        """Sends a rerun_script BackMsg carrying `widgets` ([(widget id, value field, value)])."""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+
+        msg = BackMsg()
+        state = msg.rerun_script
+        state.query_string = ''
+        state.page_script_hash = ''
+        for widget_id, field, value in widgets:
+            widget = state.widget_states.widgets.add()
+            widget.id = widget_id
+            setattr(widget, field, value)
+        if fragment_id:
+            state.fragment_id = fragment_id
+            state.is_auto_rerun = True
+        self.pending = True
+        await self.ws.send(msg.SerializeToString())
+
+    async def settle(self, until=None):
+        """Processes messages until no script is running and `until()` holds.
+
+        While waiting, fragment auto-reruns are requested when they fall due, so a
+        ticking st.fragment timer keeps running as it would in a browser.
+        """
+        deadline = time.monotonic() + self.timeout
+        while True:
+            now = time.monotonic()
+            wait = deadline - now
+            if not self.pending:
+                if self.errors:
+                    raise RoomError(self.errors[0])
+                if until is None or until():
+                    return
+                due = min(self.auto_reruns.items(), key=lambda item: item[1][1], default=None)
+                if due is not None:
+                    fragment_id, schedule = due
+                    if schedule[1] <= now:
+                        schedule[1] = max(schedule[1] + schedule[0], now)
+                        await self.request(fragment_id=fragment_id)
+                        continue
+                    wait = min(wait, schedule[1] - now)
+            if now >= deadline:
+                raise RoomError(f"timed out after {self.timeout}s waiting for the app to settle")
+            try:
+                data = await asyncio.wait_for(self.ws.recv(), max(wait, 0.001))
+            except asyncio.TimeoutError:
+                continue
+            self.handle(data)
+
+    def handle(self, data):
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        msg = ForwardMsg()
+        msg.ParseFromString(data)
+        kind = msg.WhichOneof('type')
+        now = time.monotonic()
+        if kind == 'new_session':
+            self.run_id = msg.new_session.script_run_id
+            self.run_fragments = tuple(msg.new_session.fragment_ids_this_run)
+            self.run_started = now
+            if not self.run_fragments:
+                self.auto_reruns.clear()  # a full run re-registers the fragments that still exist
+        elif kind == 'delta':
+            path = tuple(msg.metadata.delta_path)
+            for stale in [p for p in self.elements if len(p) > len(path) and p[:len(path)] == path]:
+                del self.elements[stale]
+            if msg.delta.WhichOneof('type') == 'new_element':
+                element = msg.delta.new_element
+                self.elements[path] = (self.run_id, msg.delta.fragment_id, element)
+                if element.WhichOneof('type') == 'exception':
+                    self.errors.append(f"{element.exception.type}: {element.exception.message}")
+        elif kind == 'auto_rerun':
+            interval = msg.auto_rerun.interval
+            self.auto_reruns[msg.auto_rerun.fragment_id] = [interval, now + interval]
+        elif kind == 'stop_auto_rerun':
+            for fragment_id in msg.stop_auto_rerun.fragment_ids:
+                self.auto_reruns.pop(fragment_id, None)
+        elif kind == 'script_finished':
+            status = msg.script_finished
+            self.samples.append(('fragment' if self.run_fragments else 'rerun', now - self.run_started))
+            if status == FINISHED:
+                self.elements = {p: e for p, e in self.elements.items() if e[0] == self.run_id}
+            elif status == FRAGMENT_FINISHED:
+                self.elements = {p: e for p, e in self.elements.items()
+                                 if e[0] == self.run_id or e[1] not in self.run_fragments}
+            elif status == COMPILE_ERROR:
+                self.errors.append('script failed to compile')
+            if status != EARLY_FOR_RERUN:
+                self.pending = False
+
+    def find(self, widget, label):
+        """The rendered element of type `widget` with this label, preferring an enabled one."""
+        matches = [getattr(e, widget) for _, _, e in self.elements.values()
+                   if e.WhichOneof('type') == widget and getattr(e, widget).label == label]
+        if not matches:
+            raise RoomError(f"No {widget} labelled {label!r}")
+        return next((m for m in matches if not m.disabled), matches[0])
+
+    def has(self, widget, label, disabled=None):
+        try:
+            element = self.find(widget, label)
+        except RoomError:
+            return False
+        return disabled is None or element.disabled == disabled
+
+    async def click(self, label, kind='interaction', until=None):
+        await self.submit({}, label, kind, until)
+
+    async def submit_form(self, values, label, kind='interaction'):
+        """Fills widgets ({(widget_type, label): value}) and presses `label` in a single rerun."""
+        await self.submit(values, label, kind)
+
+    async def submit(self, values, label, kind, until=None):
+        button = self.find('button', label)
+        if button.disabled:
+            raise RoomError(f"Button {label!r} is disabled")
+        widgets = [self.widget_value(widget, widget_label, value) for (widget, widget_label), value in values.items()]
+        widgets.append((button.id, 'trigger_value', True))
+        start = time.perf_counter()
+        await self.request(widgets)
+        await self.settle(until)
+        self.samples.append((kind, time.perf_counter() - start))
+
+    def widget_value(self, widget, label, value):
+        element = self.find(widget, label)
+        if widget == 'number_input':
+            field = 'int_value' if element.data_type == element.INT else 'double_value'
+        elif widget == 'checkbox':
+            field = 'bool_value'
+        else:
+            field = 'string_value'
+        return element.id, field, value
+
+
+# --- Scenarios ---
+async def scoremaster_room(room, timer_s, rounds):
+    """Setup -> per round: 3-pt timer, award, 2-pt/1-pt stages, reset round -> reset game."""
+    timers = {('number_input', label): timer_s for label in ('Timer for 3 Pts', 'Timer for 2 Pts', 'Timer for 1 Pt')}
+    await room.submit_form(timers, 'Start Game!')
+
+    def expired():
+        return room.has('button', 'Stop Timer', disabled=True)
+
+    teams = ['Team A', 'Team B', 'Team C']
+    for r in range(rounds):
+        team = teams[r % 3]
+        await room.click(f"Start Timer (3 Pts) for {team}", kind='timer', until=expired)
+        await room.click(f"✅ {team}")
+        # Next team misses its first attempt and goes through the 2-pt and 1-pt stages.
+        next_team = teams[(r + 1) % 3]
+        await room.click(f"Start Timer (3 Pts) for {next_team}", kind='timer', until=expired)
+        await room.click("Start Timer (2 Pts)", kind='timer', until=expired)
+        await room.click("Start Timer (1 Pt)", kind='timer', until=expired)
+        await room.click(f"✅ {teams[(r + 2) % 3]}")
+        await room.click("Reset Round")
+    await room.click("Reset Game")
+
+
+async def quizzo_room(room, timer_s, rounds):
+    """Generate from the stub -> proceed to board -> per round: pick, time, award, back -> reset."""
+    setup = {('number_input', label): timer_s for label in ('First Timer (3 Pts)', 'Second Timer (2 Pts)', 'Third Timer (1 Pt)')}
+    setup[('text_input', 'Quiz Topic')] = 'Load Testing'
+    setup[('number_input', 'Total Number of Questions')] = max(3, rounds)
+    await room.submit_form(setup, 'Generate & Start Quiz!', kind='generate')
+    await room.click('Proceed to Quiz Board')
+
+    def expired():
+        return room.has('button', 'End Timer', disabled=True)
+
+    for r in range(rounds):
+        await room.click(f"{r + 1}")
+        await room.click("Start Timer (3 Pts)", kind='timer', until=expired)
+        await room.click("✅ Team A" if r % 2 == 0 else "✅ Team B")
+        await room.click("Back to Board")
+    await room.click("Reset Quiz (Go to Quiz Master Mode)")
+
+
+SCENARIOS = {'scoremaster': scoremaster_room, 'quizzo': quizzo_room}
+
+
+# --- Measurement ---
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def summarize(values):
+    ms = [v * 1000 for v in values]
+    return {
+        'count': len(ms),
+        'p50_ms': round(percentile(ms, 0.5), 2),
+        'p95_ms': round(percentile(ms, 0.95), 2),
+        'max_ms': round(max(ms), 2) if ms else 0.0,
+    }
+
+
+async def play(app, url, timer_s, rounds, timeout):
+    """Plays one room and returns it still connected, so its session counts towards memory."""
+    room = Room(url, timeout)
+    try:
+        await room.open()
+        await SCENARIOS[app](room, timer_s, rounds)
+    except Exception as e:
+        room.errors.insert(0, str(e) if isinstance(e, RoomError) else f"{type(e).__name__}: {e}")
+        room.failed = True
+    return room
+
+
+async def run_rooms(app, server, sessions, rounds, timer_s, timeout):
+    # One throwaway session first, so module imports and caches are not billed to the rooms.
+    warmup = Room(server.url, timeout)
+    await warmup.open()
+    await warmup.close()
+
+    rss_before, cpu_before = server.rss_bytes(), server.cpu_seconds()
+    wall_start = time.perf_counter()
+    rooms = await asyncio.gather(*(play(app, server.url, timer_s, rounds, timeout) for _ in range(sessions)))
+    wall_s = time.perf_counter() - wall_start
+    cpu_s = server.cpu_seconds() - cpu_before
+    rss_growth = max(0, server.rss_bytes() - rss_before)
+    await asyncio.gather(*(room.close() for room in rooms))
+    return rooms, wall_s, cpu_s, rss_growth
+
+
+def run_load(app, sessions, rounds, timer_s, timeout, env):
+    server = AppServer(SCRIPTS[app], env)
+    try:
+        server.wait_ready()
+        rooms, wall_s, cpu_s, rss_growth = asyncio.run(run_rooms(app, server, sessions, rounds, timer_s, timeout))
+        tracebacks = server.tracebacks()
+    finally:
+        server.stop()
+
+    errors = [room.errors[0] for room in rooms if room.failed]
+    errors += [f"server traceback: {tb.splitlines()[-1]}" for tb in tracebacks]
+    by_kind = {}
+    for room in rooms:
+        for kind, seconds in room.samples:
+            by_kind.setdefault(kind, []).append(seconds)
+    timer_overrun = [max(0.0, s - timer_s) for s in by_kind.get('timer', [])]
+
+    return {
+        'sessions': sessions,
+        'rounds': rounds,
+        'errors': errors,
+        'wall_s': round(wall_s, 2),
+        'interaction': summarize(by_kind.get('interaction', [])),
+        'timer': summarize(by_kind.get('timer', [])),
+        'timer_overrun': summarize(timer_overrun),
+        'generate': summarize(by_kind.get('generate', [])),
+        'rerun': summarize(by_kind.get('rerun', [])),
+        'fragment': summarize(by_kind.get('fragment', [])),
+        'cpu_s_per_session': round(cpu_s / sessions, 3),
+        'cpu_utilisation': round(cpu_s / wall_s, 2) if wall_s else 0.0,
+        'rss_mb_per_session': round(rss_growth / sessions / 2**20, 2),
+    }
+
+
+def print_report(app, report):
+    failed = f" ({len(report['errors'])} failed)" if report['errors'] else ''
+    print(f"{app}: {report['sessions']} sessions x {report['rounds']} rounds in {report['wall_s']}s{failed}")
+    for key in ('interaction', 'timer', 'timer_overrun', 'generate', 'rerun', 'fragment'):
+        stats = report[key]
+        if stats.get('count'):
+            print(f"  {key:<14} p50 {stats['p50_ms']:>9.2f} ms   p95 {stats['p95_ms']:>9.2f} ms"
+                  f"   max {stats['max_ms']:>9.2f} ms   n={stats['count']}")
+    print(f"  cpu            {report['cpu_s_per_session']} s/session ({report['cpu_utilisation']} cores busy)")
+    print(f"  memory         {report['rss_mb_per_session']} MB RSS/session")
+    for error in report['errors'][:5]:
+        print(f"  error: {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--app', choices=['scoremaster', 'quizzo', 'both'], default='both')
+    parser.add_argument('--sessions', type=int, default=10, help='Concurrent game rooms.')
+    parser.add_argument('--rounds', type=int, default=3, help='Questions played per room.')
+    parser.add_argument('--timer', type=int, default=1, help='Seconds configured for every timer stage.')
+    parser.add_argument('--gemini-latency-ms', type=int, default=0, help='Delay added by the Gemini stub.')
+    parser.add_argument('--json', action='store_true', help='Emit machine-readable JSON.')
+    args = parser.parse_args()
+
+    stub, url = start_stub(latency_ms=args.gemini_latency_ms)
+    # Each step, timer phases included, must settle within this many seconds.
+    timeout = args.timer + 30
+
+    apps = ['scoremaster', 'quizzo'] if args.app == 'both' else [args.app]
+    reports = {}
+    try:
+        for app in apps:
+            reports[app] = run_load(app, args.sessions, args.rounds, args.timer, timeout, {'GEMINI_API_URL': url})
+    finally:
+        stub.shutdown()
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    else:
+        for app, report in reports.items():
+            print_report(app, report)
+    if any(report['errors'] for report in reports.values()):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
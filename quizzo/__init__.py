@@ -0,0 +1 @@
+"""Shared building blocks for the Quizzo and ScoreMaster Streamlit apps."""
@@ -0,0 +1,180 @@
+# quizzo/adaptive.py
+"""Adaptive question selection from live answer statistics.
+
+Each question's success rate is estimated from its play counters, smoothed
+towards a prior from its difficulty label. Questions are kept in a RateIndex:
+fixed success-rate buckets with a Fenwick tree over bucket counts, so finding
+and removing the question nearest a target rate is O(log buckets) no matter
+how large the bank grows.
+"""
+import random
+import threading
+
+from quizzo.question_bank import topic_key
+
+# Share of the points a stage is worth: 3, 2 or 1 of a possible 3.
+STAGE_CREDIT = {'first_person': 1.0, 'team': 2 / 3, 'opposing_team': 1 / 3, None: 0.0}
+DIFFICULTY_PRIOR = {'Easy': 0.8, 'Medium': 0.6, 'Hard': 0.4}
+PRIOR_WEIGHT = 2
+DEFAULT_TARGET = 0.6
+
+
+def success_estimate(difficulty, plays, first_person=0, team=0, opposing_team=0, unanswered=0):
+    """Smoothed expected share of points for a question (0 = nobody scores, 1 = first person always does)."""
+    credit = (first_person * STAGE_CREDIT['first_person'] + team * STAGE_CREDIT['team']
+              + opposing_team * STAGE_CREDIT['opposing_team'])
+    prior = DIFFICULTY_PRIOR.get(difficulty, DIFFICULTY_PRIOR['Medium'])
+    return (PRIOR_WEIGHT * prior + credit) / (PRIOR_WEIGHT + plays)
+
+
+class RateIndex:
+    """Questions bucketed by success rate with a Fenwick tree for nearest-rate lookups."""
+    __slots__ = ('_tree', '_buckets', '_where')
+
+    def __init__(self, resolution=100):
+        self._buckets = [[] for _ in range(resolution + 1)]
+        self._tree = [0] * (resolution + 2)
+        self._where = {}  # question_id -> (bucket, position in bucket list)
+
+    def __len__(self):
+        return len(self._where)
+
+    def __contains__(self, question_id):
+        return question_id in self._where
+
+    def _bucket(self, rate):
+        last = len(self._buckets) - 1
+        return min(last, max(0, round(rate * last)))
+
+    def _add_count(self, bucket, delta):
+        i = bucket + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _prefix(self, bucket):
+        """Number of questions in buckets 0..bucket inclusive."""
+        total, i = 0, bucket + 1
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def _find(self, k):
+        """Lowest bucket whose prefix count reaches k (1 <= k <= len)."""
+        pos, step = 0, 1 << (len(self._tree) - 1).bit_length()
+        while step:
+            nxt = pos + step
+            if nxt < len(self._tree) and self._tree[nxt] < k:
+                pos = nxt
+                k -= self._tree[nxt]
+            step >>= 1
+        return pos  # Fenwick index pos + 1 maps to bucket pos.
+
+    def add(self, question_id, rate):
+        if question_id in self._where:
+            self.remove(question_id)
+        bucket = self._bucket(rate)
+        ids = self._buckets[bucket]
+        self._where[question_id] = (bucket, len(ids))
+        ids.append(question_id)
+        self._add_count(bucket, 1)
+
+    def remove(self, question_id):
+        bucket, pos = self._where.pop(question_id)
+        ids = self._buckets[bucket]
+        last = ids.pop()
+        if last != question_id:
+            ids[pos] = last
+            self._where[last] = (bucket, pos)
+        self._add_count(bucket, -1)
+
+    def pop_nearest(self, target, rng=random):
+        """Removes and returns a random question from the non-empty bucket closest to `target`."""
+        if not self._where:
+            return None
+        t = self._bucket(target)
+        at_or_below = self._prefix(t)
+        candidates = []
+        if at_or_below:
+            candidates.append(self._find(at_or_below))
+        if at_or_below < len(self._where):
+            candidates.append(self._find(at_or_below + 1))
+        bucket = min(candidates, key=lambda b: (abs(b - t), rng.random()))
+        ids = self._buckets[bucket]
+        question_id = ids[rng.randrange(len(ids))]
+        self.remove(question_id)
+        return question_id
+
+
+class AdaptiveSampler:
+    """Picks boards from a QuestionBank so their expected success rate matches a target."""
+
+    def __init__(self, bank):
+        self.bank = bank
+        self._lock = threading.Lock()
+        self._indexes = {}
+        self._meta = {}  # question_id -> (topic_key, difficulty)
+        self._rates = {}
+        self._version = None
+
+    def _refresh(self):
+        """Rebuilds the per-topic indexes after the bank has been imported into."""
+        if self._version == self.bank.version:
+            return
+        indexes, meta, rates = {'': RateIndex()}, {}, {}
+        for row in self.bank.stats_rows():
+            row = dict(row)
+            question_id, key, difficulty = row.pop('id'), row.pop('topic_key'), row.pop('difficulty')
+            rate = success_estimate(difficulty, **row)
+            meta[question_id] = (key, difficulty)
+            rates[question_id] = rate
+            indexes[''].add(question_id, rate)
+            indexes.setdefault(key, RateIndex()).add(question_id, rate)
+        self._indexes, self._meta, self._rates = indexes, meta, rates
+        self._version = self.bank.version
+
+    def record(self, question_id, stage):
+        """Stores one outcome and moves the question to its new rate bucket."""
+        stats = self.bank.record_outcome(question_id, stage)
+        with self._lock:
+            if question_id not in self._meta:
+                return
+            key, difficulty = self._meta[question_id]
+            stats.pop('question_id')
+            rate = success_estimate(difficulty, **stats)
+            self._rates[question_id] = rate
+            for index_key in ('', key):
+                self._indexes[index_key].add(question_id, rate)
+
+    def rate(self, question_id):
+        return self._rates.get(question_id)
+
+    def pick_ids(self, total_questions, topic='', target=DEFAULT_TARGET, rng=random):
+        """Returns up to `total_questions` ids whose running mean success rate tracks `target`.
+
+        Each pick aims at whatever rate would bring the board's average back onto
+        the target, so one very hard question is balanced by easier ones.
+        """
+        with self._lock:
+            self._refresh()
+            index = self._indexes.get(topic_key(topic))
+            if index is None:
+                return []
+            picked, expected = [], 0.0
+            try:
+                for n in range(1, min(total_questions, len(index)) + 1):
+                    aim = min(1.0, max(0.0, target * n - expected))
+                    question_id = index.pop_nearest(aim, rng)
+                    picked.append(question_id)
+                    expected += self._rates[question_id]
+            finally:
+                # Picking is non-destructive for other sessions: put the questions back.
+                for question_id in picked:
+                    index.add(question_id, self._rates[question_id])
+        rng.shuffle(picked)
+        return picked
+
+    def board(self, total_questions, topic='', target=DEFAULT_TARGET, rng=random):
+        """Like pick_ids but returns full question dicts from the bank."""
+        return self.bank.fetch(self.pick_ids(total_questions, topic, target, rng))
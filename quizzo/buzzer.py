@@ -0,0 +1,410 @@
+# quizzo/buzzer.py
+"""Buzzer server: team devices press a button, the first press wins the answer.
+
+A small asyncio HTTP server runs on a daemon thread next to Streamlit and is
+shared by every host session. Each game opens its own BuzzerRoom with its own
+teams, round and lock event, served under an unguessable /r/<room id>/ path;
+phones on the local network open that page and press BUZZ (or a keyboard
+key). Each press is timestamped the moment its request line arrives.
+
+Fairness: the first press opens a short window (`window_ms`). Every press that
+arrives inside it competes, ranked by arrival time minus half the round-trip
+time of the connection it came in on. The RTT is the kernel's smoothed
+estimate for that TCP connection (TCP_INFO, Linux only; elsewhere no
+compensation is applied), so a device cannot claim a head start, and the
+compensation is capped at the window length. When the window closes the round
+locks and the ranking is final. Press-to-lock latency is therefore the window
+length plus scheduling overhead, and is recorded in quizzo.metrics under
+'buzzer.press_to_lock'.
+"""
+import asyncio
+import json
+import secrets
+import socket
+import struct
+import threading
+import time
+from dataclasses import dataclass, field
+from urllib.parse import parse_qs, urlsplit
+
+from quizzo import metrics
+
+DEFAULT_PORT = 8599
+DEFAULT_WINDOW_MS = 20
+MAX_BODY_BYTES = 4096
+ROOM_IDLE_S = 12 * 3600  # Rooms untouched this long are dropped when another room opens.
+# Linux struct tcp_info: eight u8 fields, then u32s of which tcpi_rtt (microseconds) is the 16th.
+TCP_INFO_RTT = struct.Struct('=68xI')
+
+
+class BadRequest(ValueError):
+    """A malformed request from a team device; answered with 400."""
+
+
+@dataclass(slots=True)
+class BuzzResult:
+    """Outcome of one armed round once it has locked."""
+    round_id: int
+    winner: str
+    order: list = field(default_factory=list)  # [(team, adjusted offset from winner in ms)]
+    lock_latency_ms: float = 0.0
+
+
+@dataclass(slots=True)
+class _Press:
+    team: str
+    arrival_ns: int
+    adjusted_ns: int
+
+
+class BuzzerRoom:
+    """One game's teams and buzzer rounds. Thread-safe; created by BuzzerServer.open_room()."""
+
+    def __init__(self, server, room_id, teams=()):
+        self.server = server
+        self.id = room_id
+        self.last_used = time.monotonic()
+        self._lock = threading.Lock()
+        self._teams = list(teams)
+        self._round_id = 0
+        self._armed = False
+        self._eligible = None
+        self._presses = []
+        self._result = None
+
+    @property
+    def url(self):
+        """Address this room's team devices should open."""
+        return f"{self.server.url}r/{self.id}/"
+
+    # --- Round Control (called from Streamlit) ---
+    def arm(self, eligible=None):
+        """Opens a new round; only `eligible` teams (default: all) may buzz. Returns the round id."""
+        with self._lock:
+            self._round_id += 1
+            self._armed = True
+            self._eligible = set(eligible) if eligible is not None else None
+            self._presses = []
+            self._result = None
+            self.last_used = time.monotonic()
+            return self._round_id
+
+    def disarm(self):
+        with self._lock:
+            self._armed = False
+
+    def result(self):
+        """The locked BuzzResult for the current round, or None while nobody has won yet."""
+        with self._lock:
+            return self._result
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'teams': list(self._teams),
+                'armed': self._armed,
+                'round': self._round_id,
+                'eligible': sorted(self._eligible) if self._eligible is not None else list(self._teams),
+                'winner': self._result.winner if self._result else None,
+            }
+
+    # --- Press Resolution (runs on the event loop) ---
+    def press(self, team, arrival_ns, compensation_ns=0):
+        """Registers a press; returns (accepted, reason)."""
+        with self._lock:
+            if self._teams and team not in self._teams:
+                return False, 'unknown team'
+            if not self._armed or self._result is not None:
+                return False, 'not armed'
+            if self._eligible is not None and team not in self._eligible:
+                return False, 'not your turn'
+            if any(p.team == team for p in self._presses):
+                return False, 'already pressed'
+            first = not self._presses
+            if not first and arrival_ns - self._presses[0].arrival_ns > self.server.window_ns:
+                return False, 'too late'
+            self._presses.append(_Press(team, arrival_ns, arrival_ns - compensation_ns))
+            round_id = self._round_id
+            everyone_in = self._eligible is not None and len(self._presses) == len(self._eligible)
+        if everyone_in:
+            self._lock_round(round_id)
+        elif first:
+            self.server.call_later(self.server.window_ns / 1e9, self._lock_round, round_id)
+        return True, 'ok'
+
+    def _lock_round(self, round_id):
+        now_ns = time.perf_counter_ns()
+        with self._lock:
+            if round_id != self._round_id or self._result is not None or not self._presses:
+                return
+            ranked = sorted(self._presses, key=lambda p: p.adjusted_ns)
+            first_arrival = min(p.arrival_ns for p in self._presses)
+            best = ranked[0].adjusted_ns
+            self._result = BuzzResult(
+                round_id=round_id,
+                winner=ranked[0].team,
+                order=[(p.team, round((p.adjusted_ns - best) / 1e6, 2)) for p in ranked],
+                lock_latency_ms=round((now_ns - first_arrival) / 1e6, 3),
+            )
+            self._armed = False
+        metrics.observe('buzzer.press_to_lock', (now_ns - first_arrival) / 1e9)
+
+
+class BuzzerServer:
+    """The asyncio HTTP server that feeds presses into its BuzzerRooms."""
+
+    def __init__(self, host='0.0.0.0', port=DEFAULT_PORT, window_ms=DEFAULT_WINDOW_MS, max_compensation_ms=None):
+        self.host = host
+        self.port = port
+        self.window_ns = int(window_ms * 1e6)
+        # Compensation beyond the window could let a press outrank one that locked a round already.
+        cap_ms = window_ms if max_compensation_ms is None else min(max_compensation_ms, window_ms)
+        self.max_compensation_ns = int(cap_ms * 1e6)
+        self._lock = threading.Lock()
+        self._rooms = {}
+        self._loop = None
+        self._server = None
+        self._thread = None
+
+    # --- Lifecycle ---
+    def start(self):
+        """Starts the event loop thread and waits until the port is bound."""
+        if self._thread is not None:
+            return self
+        started, errors = threading.Event(), []
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            try:
+                self._server = self._loop.run_until_complete(
+                    asyncio.start_server(self._handle_connection, self.host, self.port))
+                self.port = self._server.sockets[0].getsockname()[1]
+            except OSError as e:
+                errors.append(e)
+                started.set()
+                return
+            started.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name='quizzo-buzzer', daemon=True)
+        self._thread.start()
+        started.wait()
+        if errors:
+            self._thread = None
+            raise errors[0]
+        return self
+
+    def stop(self):
+        if self._thread is None:
+            return
+
+        async def shutdown():
+            self._server.close()
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self._loop.stop()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self._loop)
+        self._thread.join(timeout=2)
+        self._thread = None
+
+    @property
+    def url(self):
+        """Base address of the server, using this machine's LAN IP."""
+        return f"http://{lan_ip()}:{self.port}/"
+
+    def call_later(self, delay_s, callback, *args):
+        self._loop.call_later(delay_s, callback, *args)
+
+    # --- Rooms (called from Streamlit) ---
+    def open_room(self, teams=()):
+        """Creates a room with a fresh unguessable id; also drops rooms idle for ROOM_IDLE_S."""
+        now = time.monotonic()
+        with self._lock:
+            for room_id in [r for r, room in self._rooms.items() if now - room.last_used > ROOM_IDLE_S]:
+                del self._rooms[room_id]
+            room = BuzzerRoom(self, secrets.token_urlsafe(6), teams)
+            self._rooms[room.id] = room
+            return room
+
+    def room(self, room_id):
+        """The open room with this id, or None."""
+        with self._lock:
+            return self._rooms.get(room_id)
+
+    def close_room(self, room_id):
+        with self._lock:
+            room = self._rooms.pop(room_id, None)
+        if room is not None:
+            room.disarm()
+
+    # --- HTTP ---
+    def compensation_ns(self, sock):
+        """Half the kernel's smoothed RTT for this connection, capped; 0 where TCP_INFO is unavailable."""
+        if sock is None or not hasattr(socket, 'TCP_INFO'):
+            return 0
+        try:
+            info = sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_INFO, TCP_INFO_RTT.size)
+            (rtt_us,) = TCP_INFO_RTT.unpack_from(info)
+        except (OSError, struct.error):
+            return 0
+        return min(rtt_us * 1000 // 2, self.max_compensation_ns)
+
+    async def _handle_connection(self, reader, writer):
+        sock = writer.get_extra_info('socket')
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            while True:
+                request_line = await reader.readline()
+                arrival_ns = time.perf_counter_ns()
+                if not request_line:
+                    break
+                try:
+                    method, target, body, headers = await self._read_request(reader, request_line)
+                    await self._route(writer, method, target, body, arrival_ns, sock)
+                except BadRequest as e:
+                    await self._respond(writer, 400, {'error': str(e)}, close=True)
+                    break
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError, ValueError):
+            pass  # Client went away, sent an over-long line, or stop() is shutting the loop down.
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader, request_line):
+        """Parses one request; raises BadRequest for anything malformed."""
+        try:
+            method, target, _ = request_line.decode('latin-1').split(' ', 2)
+        except ValueError:
+            raise BadRequest('bad request line') from None
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        length = headers.get('content-length') or '0'
+        if not length.isdigit():
+            raise BadRequest('bad Content-Length')
+        if int(length) > MAX_BODY_BYTES:
+            raise BadRequest('body too large')
+        body = await reader.readexactly(int(length)) if int(length) else b''
+        return method, target, body, headers
+
+    async def _route(self, writer, method, target, body, arrival_ns, sock):
+        # Room pages live under /r/<room id>/; the page uses relative URLs for state and buzz.
+        parts = urlsplit(target).path.split('/')
+        room = self.room(parts[2]) if len(parts) >= 3 and parts[1] == 'r' else None
+        action = '/'.join(parts[3:]) if room is not None else None
+        if method == 'GET' and len(parts) == 3 and room is not None:
+            await self._respond(writer, 308, '', headers={'Location': f"/r/{room.id}/"})
+        elif method == 'GET' and action == '':
+            await self._respond(writer, 200, TEAM_PAGE, content_type='text/html; charset=utf-8')
+        elif method == 'GET' and action == 'state':
+            await self._respond(writer, 200, room.snapshot())
+        elif method == 'POST' and action == 'buzz':
+            team = parse_team(body)
+            accepted, reason = room.press(team, arrival_ns, self.compensation_ns(sock))
+            await self._respond(writer, 200, {'accepted': accepted, 'reason': reason})
+        else:
+            await self._respond(writer, 404, {'error': 'not found'})
+
+    async def _respond(self, writer, status, payload, content_type='application/json', headers=None, close=False):
+        body = payload.encode('utf-8') if isinstance(payload, str) else json.dumps(payload).encode('utf-8')
+        reason = {200: 'OK', 308: 'Permanent Redirect', 400: 'Bad Request', 404: 'Not Found'}.get(status, 'OK')
+        extra = ''.join(f"{name}: {value}\r\n" for name, value in (headers or {}).items())
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\nContent-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\nCache-Control: no-store\r\n{extra}"
+            f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n".encode('latin-1') + body)
+        await writer.drain()
+
+
+def parse_team(body):
+    """The team name from a /buzz body (JSON object or form-encoded); raises BadRequest."""
+    try:
+        data = json.loads(body or b'{}')
+    except ValueError:
+        data = {k: v[0] for k, v in parse_qs(body.decode('utf-8', 'replace')).items()}
+    if not isinstance(data, dict):
+        raise BadRequest('body must be an object')
+    team = data.get('team')
+    if not isinstance(team, str) or not team:
+        raise BadRequest('team must be a non-empty string')
+    return team
+
+
+def lan_ip():
+    """Best-effort LAN address of this machine (no packets are sent)."""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        try:
+            s.connect(('10.255.255.255', 1))
+            return s.getsockname()[0]
+        except OSError:
+            return '127.0.0.1'
+
+
+# Served to team devices. Keys 1-9 pick a team; Space or Enter buzzes.
+TEAM_PAGE = """<!doctype html>
+<html><head><meta charset="utf-8"><meta name="viewport" content="width=device-width, initial-scale=1">
+<title>Quizzo Buzzer</title>
+<style>
+  body { font-family: system-ui, sans-serif; margin: 0; text-align: center; background: #fffbea; }
+  #teams button { margin: 8px; padding: 14px 22px; font-size: 1.2rem; border-radius: 8px; border: 2px solid #F4C430; background: #fff; }
+  #teams button.active { background: #F4C430; color: #fff; }
+  #buzz { width: 80vw; height: 55vh; margin-top: 4vh; border-radius: 50%; border: none; font-size: 3rem; font-weight: 700;
+          color: #fff; background: #F44336; box-shadow: 0 10px 20px rgba(0,0,0,.2); }
+  #buzz:disabled { background: #d3d3d3; }
+  #status { font-size: 1.4rem; margin-top: 12px; min-height: 2em; }
+</style></head>
+<body>
+<div id="teams"></div>
+<button id="buzz" disabled>BUZZ</button>
+<div id="status">Pick your team</div>
+<script>
+const teamKey = 'quizzo-team:' + location.pathname;
+let team = localStorage.getItem(teamKey), round = -1, pressedRound = -1;
+const teamsEl = document.getElementById('teams'), buzzEl = document.getElementById('buzz'), statusEl = document.getElementById('status');
+function pick(name) { team = name; localStorage.setItem(teamKey, name); render(lastState); }
+async function buzz() {
+  if (!team || buzzEl.disabled) return;
+  pressedRound = round; buzzEl.disabled = true;
+  const res = await fetch('buzz', {method: 'POST', headers: {'Content-Type': 'application/json'}, body: JSON.stringify({team: team})});
+  const data = await res.json();
+  statusEl.textContent = data.accepted ? 'Buzzed!' : data.reason;
+}
+let lastState = null;
+function render(state) {
+  if (!state) return;
+  lastState = state; round = state.round;
+  teamsEl.innerHTML = '';
+  state.teams.forEach((name, i) => {
+    const b = document.createElement('button'); b.textContent = (i + 1) + '. ' + name;
+    if (name === team) b.className = 'active';
+    b.onclick = () => pick(name); teamsEl.appendChild(b);
+  });
+  const eligible = state.eligible.includes(team);
+  buzzEl.disabled = !(team && state.armed && eligible && pressedRound !== round);
+  if (state.winner) statusEl.textContent = state.winner === team ? 'You were first!' : state.winner + ' was first';
+  else if (state.armed && !eligible && team) statusEl.textContent = 'Not your turn';
+  else if (state.armed && pressedRound !== round) statusEl.textContent = 'Ready...';
+}
+async function poll() {
+  try { const res = await fetch('state', {cache: 'no-store'}); render(await res.json()); } catch (e) {}
+}
+buzzEl.addEventListener('pointerdown', buzz);
+document.addEventListener('keydown', (e) => {
+  if (e.key === ' ' || e.key === 'Enter') { e.preventDefault(); buzz(); }
+  else if (lastState && e.key >= '1' && e.key <= '9' && lastState.teams[+e.key - 1]) pick(lastState.teams[+e.key - 1]);
+});
+// Polling also keeps the connection warm, so the server's RTT estimate for it stays current.
+poll(); setInterval(poll, 300);
+</script>
+</body></html>
+"""
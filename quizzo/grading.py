@@ -0,0 +1,232 @@
+# quizzo/grading.py
+"""Automatic grading of typed team answers against a question's stored answer.
+
+Answers and submissions go through the same normalisation (accents, case,
+punctuation, leading articles, common abbreviations, small number words).
+Each stored answer is compiled once into an AnswerKey holding its accepted
+variants, so grading a submission is a set lookup in the common case and a
+bounded edit-distance check per word only when that misses. Numbers (digits
+or Roman numerals) must match exactly, and the typo budget is kept small
+enough that a different real word ("Austria" for "Australia", "South" for
+"North") is not mistaken for a typo. Extra words in front of the answer are
+left to the host rather than marked correct, so hedges ("Rome or Paris") do
+not score. Identical submissions
+(very common when many teams type the same thing) are memoised per key.
+
+Alternatives can be written into the answer itself, separated by a spaced
+slash ("Paris / Lutetia", so "AC/DC" and "24/7" stay whole), or in brackets
+("Mercury (planet)"), or passed as an alias list.
+"""
+import functools
+import re
+import unicodedata
+from dataclasses import dataclass
+
+ARTICLES = frozenset({'the', 'a', 'an'})
+# Token-level canonical forms so "USA", "U.S." and "United States" compare equal.
+SYNONYMS = {
+    'us': 'united states', 'usa': 'united states',
+    'uk': 'united kingdom', 'britain': 'united kingdom', 'gb': 'united kingdom',
+    'uae': 'united arab emirates', 'ussr': 'soviet union',
+    'st': 'saint', 'mt': 'mount', 'ft': 'fort', 'dr': 'doctor', 'jr': 'junior', 'sr': 'senior',
+    '&': 'and', 'vs': 'versus', 'v': 'versus',
+}
+NUMBER_WORDS = {
+    word: str(n) for n, word in enumerate(
+        'zero one two three four five six seven eight nine ten eleven twelve thirteen '
+        'fourteen fifteen sixteen seventeen eighteen nineteen twenty'.split())
+}
+# Words that turn an answer into a wrong one when typed in front of it ("not Einstein", "Rome or Paris").
+NEGATIONS = frozenset({'not', 'no', 'never', 'neither', 'nor', 'isnt', 'wasnt', 'arent', 'werent'})
+HEDGES = frozenset({'or', 'either', 'maybe', 'perhaps'})
+ROMAN_NUMERAL = re.compile(r'm{0,3}(cm|cd|d?c{0,3})(xc|xl|l?x{0,3})(ix|iv|v?i{0,3})')
+ALTERNATIVE_SPLIT = re.compile(r'\s+/\s+')
+PARENTHETICAL = re.compile(r'\s*[\(\[]([^\)\]]*)[\)\]]\s*')
+LETTER_DOT = re.compile(r'(?<=[^\W\d_])\.(?=[^\W\d_])')
+# Decimals and fractions ("1.5", "1/2", "24/7") are single tokens; other punctuation separates words.
+TOKEN = re.compile(r"\d+(?:[./]\d+)+|[\w&]+")
+MAX_EXTRA_WORDS = 2
+MEMO_LIMIT = 2048
+
+
+def normalize(text):
+    """Folds text to the comparable form used for both answers and submissions."""
+    text = unicodedata.normalize('NFKD', str(text or ''))
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch)).casefold()
+    text = LETTER_DOT.sub('', text.replace("'", ''))  # "O'Neil" -> "oneil", "U.S." -> "us", "1.5" stays
+    tokens = []
+    for token in TOKEN.findall(text):
+        token = NUMBER_WORDS.get(token, token)
+        tokens.extend(SYNONYMS.get(token, token).split())
+    while len(tokens) > 1 and tokens[0] in ARTICLES:
+        tokens.pop(0)
+    return ' '.join(tokens)
+
+
+def max_typos(length):
+    """Edit distance tolerated for a normalised word of this length.
+
+    Two edits already turn many real words into others ("Stalagmite" /
+    "Stalactite"), so they are only allowed on long words.
+    """
+    if length <= 4:
+        return 0
+    return 1 if length <= 10 else 2
+
+
+def is_number(token):
+    """Digits or a Roman numeral ("1945", "1.5", "viii"); these never get a typo allowance."""
+    return any(ch.isdigit() for ch in token) or ROMAN_NUMERAL.fullmatch(token) is not None
+
+
+def bounded_distance(a, b, limit):
+    """Edit distance between a and b, or limit + 1 as soon as it must exceed limit.
+
+    Levenshtein distance where swapping two adjacent letters ("Einstien") also
+    counts as one edit (optimal string alignment). Only a diagonal band of
+    width 2 * limit + 1 is computed, so the cost is O(len * limit) rather than
+    O(len_a * len_b).
+    """
+    if a == b:
+        return 0
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if len(a) > len(b):
+        a, b = b, a
+    over = limit + 1
+    before, previous = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        lo, hi = max(1, i - limit), min(len(b), i + limit)
+        current = [over] * (len(b) + 1)
+        current[0] = i if i <= limit else over
+        best = current[0]
+        for j in range(lo, hi + 1):
+            cost = previous[j - 1] + (ca != b[j - 1])
+            cost = min(cost, previous[j] + 1, current[j - 1] + 1)
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == b[j - 1]:
+                cost = min(cost, before[j - 2] + 1)
+            current[j] = cost
+            best = min(best, cost)
+        if best > limit:
+            return over
+        before, previous = previous, current
+    return min(previous[len(b)], over)
+
+
+@dataclass(slots=True, frozen=True)
+class Grade:
+    """Result of grading one submission."""
+    correct: bool
+    score: float     # 0..1 similarity to the closest accepted variant
+    reason: str      # 'exact', 'typo', 'partial', 'blank' or 'wrong'
+    matched: str = ''
+
+
+class AnswerKey:
+    """The accepted variants of one stored answer, precomputed for fast grading."""
+    __slots__ = ('answer', 'variants', 'compact', 'tokens', '_memo')
+
+    def __init__(self, answer, aliases=()):
+        self.answer = answer
+        variants = []
+        for text in (answer, *aliases):
+            variants.extend(answer_variants(text))
+        self.variants = tuple(dict.fromkeys(v for v in variants if v))
+        self.compact = {v.replace(' ', ''): v for v in self.variants}
+        self.tokens = tuple((v, tuple(v.split())) for v in self.variants)
+        self._memo = {}
+
+    def grade(self, submission):
+        normalized = normalize(submission)
+        hit = self._memo.get(normalized)
+        if hit is None:
+            hit = self._grade(normalized)
+            if len(self._memo) >= MEMO_LIMIT:
+                self._memo.clear()
+            self._memo[normalized] = hit
+        return hit
+
+    def grade_many(self, submissions):
+        """Grades a {team: text} mapping (or an iterable of texts, returning a list)."""
+        if isinstance(submissions, dict):
+            return {team: self.grade(text) for team, text in submissions.items()}
+        return [self.grade(text) for text in submissions]
+
+    def _grade(self, normalized):
+        if not normalized:
+            return Grade(False, 0.0, 'blank')
+        compact = normalized.replace(' ', '')
+        if compact in self.compact:
+            return Grade(True, 1.0, 'exact', self.compact[compact])
+
+        words = normalized.split()
+        # Typos are budgeted per word, so "South Carolina" is not two typos away from "North Carolina".
+        for variant, tokens in self.tokens:
+            if len(tokens) == len(words):
+                distances = [_token_distance(token, word) for token, word in zip(tokens, words)]
+                if None not in distances:
+                    return Grade(True, 1 - sum(distances) / max(len(compact), len(variant)), 'typo', variant)
+
+        best_variant, best_score, partial = '', 0.0, False
+        for variant, tokens in self.tokens:
+            matched = sum(1 for token in tokens if _token_in(token, words))
+            score = matched / len(tokens)
+            # The whole answer, in order, after at most two leading words ("Albert Einstein" for
+            # "Einstein") is the host's call: the extras may be a first name or a hedge the host
+            # can see. A negation or "or" ("not Einstein", "Rome or Paris") makes it wrong.
+            extra = len(words) - len(tokens)
+            if 0 < extra <= MAX_EXTRA_WORDS and all(map(_token_match, tokens, words[extra:])):
+                hedged = not (NEGATIONS | HEDGES).isdisjoint(words[:extra])
+                return Grade(False, score, 'wrong' if hedged else 'partial', variant)
+            if score > best_score:
+                best_variant, best_score = variant, score
+                # Only some answer words and nothing else ("Einstein" for "Albert Einstein"): left to the host.
+                partial = all(_token_in(word, tokens) for word in words)
+        return Grade(False, best_score, 'partial' if partial else 'wrong', best_variant)
+
+
+def _token_distance(token, word):
+    """Edit distance between an answer word and a submitted word, or None if over budget."""
+    if token == word:
+        return 0
+    if is_number(token) or is_number(word):
+        return None  # "10001" is not a typo of "10000", nor "VII" of "VIII".
+    limit = max_typos(len(token))
+    distance = bounded_distance(token, word, limit)
+    return distance if distance <= limit else None
+
+
+def _token_match(token, word):
+    return _token_distance(token, word) is not None
+
+
+def _token_in(token, words):
+    return any(_token_match(token, word) for word in words)
+
+
+def answer_variants(text):
+    """Normalised alternatives written into one answer string."""
+    text = str(text or '')
+    variants = []
+    for part in ALTERNATIVE_SPLIT.split(text):
+        bare = PARENTHETICAL.sub(' ', part)
+        variants.append(normalize(bare))
+        for inner in PARENTHETICAL.findall(part):  # "Mercury (planet)" accepts "Mercury" and "Mercury planet".
+            variants.append(normalize(f"{bare} {inner}"))
+    return variants
+
+
+@functools.lru_cache(maxsize=4096)
+def answer_key(answer, aliases=()):
+    """Returns the cached AnswerKey for an answer; `aliases` must be a tuple."""
+    return AnswerKey(answer, aliases)
+
+
+def index_answers(questions):
+    """Compiles (and caches) the answer key of every question before play starts."""
+    return {i: answer_key(str(q['answer'])) for i, q in enumerate(questions)}
+
+
+def grade(answer, submission, aliases=()):
+    """Convenience wrapper: grades one submission against an answer string."""
+    return answer_key(answer, tuple(aliases)).grade(submission)
@@ -0,0 +1,56 @@
+# quizzo/lazy.py
+import importlib
+import sys
+import threading
+import types
+
+
+class LazyModule(types.ModuleType):
+    """Module stand-in that defers the real import until an attribute is first used."""
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__['_lazy_target'] = None
+        self.__dict__['_lazy_lock'] = threading.Lock()
+
+    def _load(self):
+        module = self.__dict__['_lazy_target']
+        if module is None:
+            # Sessions run on separate threads; only one of them may perform the first import,
+            # the others wait for it instead of seeing a partially initialised module.
+            with self.__dict__['_lazy_lock']:
+                module = self.__dict__['_lazy_target']
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__['_lazy_target'] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = 'loaded' if self.__dict__['_lazy_target'] is not None else 'not loaded'
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+_placeholders = {}
+_placeholders_lock = threading.Lock()
+
+
+def lazy_import(name):
+    """Returns the module if it is already imported, otherwise a LazyModule placeholder.
+
+    Placeholders are shared per name so every rerun and session waits on the same
+    import lock, and a module another thread is still importing is never returned.
+    """
+    module = sys.modules.get(name)
+    if module is not None and not getattr(getattr(module, '__spec__', None), '_initializing', False):
+        return module
+    with _placeholders_lock:
+        placeholder = _placeholders.get(name)
+        if placeholder is None:
+            placeholder = _placeholders[name] = LazyModule(name)
+        return placeholder
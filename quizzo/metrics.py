@@ -0,0 +1,337 @@
+# quizzo/metrics.py
+"""Lightweight rerun and hot-path instrumentation for the Streamlit apps.
+
+Spans are aggregated process-wide so every session contributes to the same
+numbers. Set QUIZZO_METRICS_PORT to expose them in Prometheus text format on
+/metrics (and as JSON on /metrics.json), or open the app with ?debug=1 to see
+the overlay panel.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import streamlit as st
+
+# Histogram bucket upper bounds, in seconds.
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+RATE_WINDOW_S = 60
+SESSION_IDLE_S = 600
+
+_lock = threading.Lock()
+_spans = {}
+_sessions = {}
+_rerun_totals = {}  # (app, kind) -> runs since process start; never pruned, so safe to export as a counter
+
+
+# --- Aggregation ---
+class SpanStats:
+    """Running count/sum/max and bucket counts for one named span."""
+    __slots__ = ('count', 'total', 'max', 'last', 'errors', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+        self.errors = 0
+        self.buckets = [0] * len(BUCKETS)
+
+    def observe(self, seconds, error=False):
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        self.max = max(self.max, seconds)
+        if error:
+            self.errors += 1
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+
+    def quantile(self, q):
+        """Estimates a quantile from the buckets (upper bound of the bucket holding it, capped at max)."""
+        if not self.count:
+            return 0.0
+        target, seen = q * self.count, 0
+        for bound, n in zip(BUCKETS, self.buckets):
+            seen += n
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'total_s': round(self.total, 6),
+            'mean_ms': round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            'last_ms': round(self.last * 1000, 3),
+            'max_ms': round(self.max * 1000, 3),
+            'p50_ms': round(self.quantile(0.5) * 1000, 3),
+            'p95_ms': round(self.quantile(0.95) * 1000, 3),
+        }
+
+
+class SessionStats:
+    """Rerun counters for a single browser session; the rate covers full and fragment runs."""
+    __slots__ = ('app', 'reruns', 'fragment_runs', 'recent', 'last_seen')
+
+    def __init__(self, app):
+        self.app = app
+        self.reruns = 0
+        self.fragment_runs = 0
+        self.recent = deque()
+        self.last_seen = 0.0
+
+    def hit(self, now, kind='full'):
+        if kind == 'fragment':
+            self.fragment_runs += 1
+        else:
+            self.reruns += 1
+        self.last_seen = now
+        self.recent.append(now)
+        while self.recent and now - self.recent[0] > RATE_WINDOW_S:
+            self.recent.popleft()
+
+    def reruns_per_minute(self, now):
+        return sum(1 for t in self.recent if now - t <= RATE_WINDOW_S) * 60 / RATE_WINDOW_S
+
+
+def observe(name, seconds, error=False):
+    """Records one duration sample for the named span."""
+    with _lock:
+        stats = _spans.get(name)
+        if stats is None:
+            stats = _spans[name] = SpanStats()
+        stats.observe(seconds, error)
+
+
+@contextmanager
+def span(name):
+    """Times the enclosed block and records it under `name`.
+
+    An exception is tallied as an error; st.rerun() and st.stop() raise
+    BaseException subclasses, so they count as a normal completion.
+    """
+    start = time.perf_counter()
+    error = False
+    try:
+        yield
+    except Exception:
+        error = True
+        raise
+    finally:
+        observe(name, time.perf_counter() - start, error)
+
+
+def timed(name=None):
+    """Decorator form of span(); defaults to the function's qualified name."""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# --- Per-Session Rerun Counting ---
+def _script_run_ctx():
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    return get_script_run_ctx()
+
+
+def _session_id():
+    ctx = _script_run_ctx()
+    return ctx.session_id if ctx is not None else 'bare'
+
+
+def record_rerun(app, kind='full'):
+    """Counts one run ('full' or 'fragment') for the current session and prunes sessions that went idle."""
+    now = time.time()
+    session_id = _session_id()
+    with _lock:
+        stats = _sessions.get(session_id)
+        if stats is None:
+            stats = _sessions[session_id] = SessionStats(app)
+        stats.hit(now, kind)
+        _rerun_totals[app, kind] = _rerun_totals.get((app, kind), 0) + 1
+        for sid in [sid for sid, s in _sessions.items() if now - s.last_seen > SESSION_IDLE_S]:
+            del _sessions[sid]
+    return stats
+
+
+def record_fragment_run(app):
+    """Counts a fragment-only rerun; call it at the top of a fragment body.
+
+    Fragment runs skip the app_rerun() wrapper, so without this a ticking timer
+    would not show up in the rerun counters. Does nothing during a full run,
+    which app_rerun() has already counted.
+    """
+    ctx = _script_run_ctx()
+    if ctx is not None and ctx.fragment_ids_this_run:
+        record_rerun(app, kind='fragment')
+
+
+@contextmanager
+def app_rerun(app):
+    """Wraps one script run: counts it, times it and renders the debug panel when enabled."""
+    start_metrics_server_from_env()
+    record_rerun(app)
+    if debug_enabled():
+        render_debug_panel(app)
+    start = time.perf_counter()
+    error = False
+    try:
+        yield
+    except Exception:
+        error = True
+        raise
+    finally:
+        observe(f"{app}.rerun", time.perf_counter() - start, error)
+
+
+# --- Export ---
+def snapshot():
+    """Returns all metrics as a JSON-serialisable dict."""
+    now = time.time()
+    with _lock:
+        spans = {name: stats.to_dict() for name, stats in sorted(_spans.items())}
+        sessions = {
+            sid: {
+                'app': s.app,
+                'reruns': s.reruns,
+                'fragment_runs': s.fragment_runs,
+                'reruns_per_minute': s.reruns_per_minute(now),
+                'idle_s': round(now - s.last_seen, 1),
+            }
+            for sid, s in _sessions.items()
+        }
+        reruns_total = {}
+        for (app, kind), total in sorted(_rerun_totals.items()):
+            reruns_total.setdefault(app, {})[kind] = total
+    return {'timestamp': now, 'spans': spans, 'sessions': sessions, 'reruns_total': reruns_total}
+
+
+def dump_json(path=None):
+    """Returns the snapshot as JSON text, also writing it to `path` when given."""
+    text = json.dumps(snapshot(), indent=2)
+    if path:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+    return text
+
+
+def render_prometheus():
+    """Renders all metrics in the Prometheus text exposition format."""
+    now = time.time()
+    lines = [
+        '# HELP quizzo_span_seconds Wall time of instrumented spans.',
+        '# TYPE quizzo_span_seconds histogram',
+    ]
+    with _lock:
+        for name, stats in sorted(_spans.items()):
+            label = _escape_label(name)
+            cumulative = 0
+            for bound, n in zip(BUCKETS, stats.buckets):
+                cumulative += n
+                lines.append(f'quizzo_span_seconds_bucket{{span="{label}",le="{bound}"}} {cumulative}')
+            lines.append(f'quizzo_span_seconds_bucket{{span="{label}",le="+Inf"}} {stats.count}')
+            lines.append(f'quizzo_span_seconds_sum{{span="{label}"}} {stats.total:.6f}')
+            lines.append(f'quizzo_span_seconds_count{{span="{label}"}} {stats.count}')
+
+        lines.append('# HELP quizzo_span_errors_total Spans that ended with an unexpected exception.')
+        lines.append('# TYPE quizzo_span_errors_total counter')
+        for name, stats in sorted(_spans.items()):
+            lines.append(f'quizzo_span_errors_total{{span="{_escape_label(name)}"}} {stats.errors}')
+
+        per_app = {}
+        for s in _sessions.values():
+            active, rate = per_app.get(s.app, (0, 0.0))
+            is_active = now - s.last_seen <= RATE_WINDOW_S
+            per_app[s.app] = (active + is_active, rate + s.reruns_per_minute(now))
+        totals = sorted(_rerun_totals.items())
+
+    lines.append('# HELP quizzo_reruns_total Script runs since the process started, full and fragment-only.')
+    lines.append('# TYPE quizzo_reruns_total counter')
+    lines.extend(f'quizzo_reruns_total{{app="{_escape_label(app)}",kind="{kind}"}} {total}'
+                 for (app, kind), total in totals)
+    lines.append(f'# HELP quizzo_active_sessions Sessions that reran in the last {RATE_WINDOW_S}s.')
+    lines.append('# TYPE quizzo_active_sessions gauge')
+    lines.extend(f'quizzo_active_sessions{{app="{_escape_label(app)}"}} {v[0]}' for app, v in sorted(per_app.items()))
+    lines.append('# HELP quizzo_reruns_per_minute Summed rerun rate of all sessions.')
+    lines.append('# TYPE quizzo_reruns_per_minute gauge')
+    lines.extend(f'quizzo_reruns_per_minute{{app="{_escape_label(app)}"}} {v[1]:.1f}' for app, v in sorted(per_app.items()))
+    return '\n'.join(lines) + '\n'
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == '/metrics':
+            body, content_type = render_prometheus(), 'text/plain; version=0.0.4'
+        elif self.path == '/metrics.json':
+            body, content_type = dump_json(), 'application/json'
+        else:
+            self.send_error(404)
+            return
+        payload = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@st.cache_resource(show_spinner=False)
+def start_metrics_server(port, host='127.0.0.1'):
+    """Starts the /metrics HTTP endpoint on a daemon thread, once per process.
+
+    Binds to loopback by default: /metrics.json lists session ids, so exposing
+    it to the network is an explicit choice (QUIZZO_METRICS_HOST=0.0.0.0).
+    """
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name='quizzo-metrics', daemon=True).start()
+    return server
+
+
+def start_metrics_server_from_env():
+    port = os.environ.get('QUIZZO_METRICS_PORT')
+    if port:
+        start_metrics_server(int(port), os.environ.get('QUIZZO_METRICS_HOST', '127.0.0.1'))
+
+
+# --- Debug Overlay ---
+def debug_enabled():
+    return os.environ.get('QUIZZO_DEBUG') == '1' or st.query_params.get('debug') == '1'
+
+
+def render_debug_panel(app):
+    """Shows this session's rerun rate and the process-wide span table in the sidebar."""
+    data = snapshot()
+    session = data['sessions'].get(_session_id(), {})
+    with st.sidebar.expander("🛠 Performance", expanded=True):
+        st.caption(f"{app} · {len(data['sessions'])} live session(s)")
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Reruns", session.get('reruns', 0))
+        col2.metric("Fragment runs", session.get('fragment_runs', 0))
+        col3.metric("Runs / min", f"{session.get('reruns_per_minute', 0):.0f}")
+        rows = [{'span': name, **stats} for name, stats in data['spans'].items()]
+        if rows:
+            st.dataframe(rows, hide_index=True, use_container_width=True,
+                         column_order=('span', 'count', 'last_ms', 'p50_ms', 'p95_ms', 'max_ms', 'errors'))
+        st.download_button("Download metrics JSON", json.dumps(data, indent=2),
+                           file_name='quizzo_metrics.json', mime='application/json', use_container_width=True)
@@ -0,0 +1,325 @@
+# quizzo/question_bank.py
+"""Local question bank: import xlsx/CSV/JSONL files and sample quizzes offline.
+
+Questions live in a small SQLite file indexed by topic, difficulty and tag.
+Sampling works from in-memory id lists per (topic, difficulty) that are rebuilt
+only after an import, so drawing a quiz does not scan the table.
+"""
+import csv
+import io
+import json
+import os
+import random
+import sqlite3
+import threading
+
+from quizzo.lazy import lazy_import
+
+pd = lazy_import('pandas')
+
+DIFFICULTY_MIX = {'Easy': 0.3, 'Medium': 0.4, 'Hard': 0.3}
+DIFFICULTIES = tuple(DIFFICULTY_MIX)
+DEFAULT_DIFFICULTY = 'Medium'
+DEFAULT_BANK_PATH = os.environ.get('QUIZZO_BANK_PATH', 'question_bank.sqlite3')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS questions (
+    id INTEGER PRIMARY KEY,
+    question TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    topic_key TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    UNIQUE (topic_key, question)
+);
+CREATE INDEX IF NOT EXISTS idx_questions_topic_difficulty ON questions (topic_key, difficulty);
+CREATE INDEX IF NOT EXISTS idx_questions_difficulty ON questions (difficulty);
+CREATE TABLE IF NOT EXISTS question_tags (
+    question_id INTEGER NOT NULL REFERENCES questions (id) ON DELETE CASCADE,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (question_id, tag)
+);
+CREATE INDEX IF NOT EXISTS idx_question_tags_tag ON question_tags (tag);
+CREATE TABLE IF NOT EXISTS question_stats (
+    question_id INTEGER PRIMARY KEY REFERENCES questions (id) ON DELETE CASCADE,
+    plays INTEGER NOT NULL DEFAULT 0,
+    first_person INTEGER NOT NULL DEFAULT 0,
+    team INTEGER NOT NULL DEFAULT 0,
+    opposing_team INTEGER NOT NULL DEFAULT 0,
+    unanswered INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+# Timer stage that earned the points -> question_stats column. None means nobody scored.
+OUTCOME_COLUMNS = {'first_person': 'first_person', 'team': 'team', 'opposing_team': 'opposing_team', None: 'unanswered'}
+
+
+class QuestionBankError(ValueError):
+    """Raised when an imported file cannot be read as a question bank."""
+
+
+# --- Difficulty Mix ---
+def difficulty_split(total_questions):
+    """Splits a question count into {difficulty: count} following DIFFICULTY_MIX.
+
+    Easy and Medium are rounded down and Hard takes the remainder, matching the
+    original 30/40/30 generator.
+    """
+    num_easy = int(total_questions * DIFFICULTY_MIX['Easy'])
+    num_medium = int(total_questions * DIFFICULTY_MIX['Medium'])
+    return {'Easy': num_easy, 'Medium': num_medium, 'Hard': total_questions - num_easy - num_medium}
+
+
+def normalize_difficulty(value):
+    """Maps free-form difficulty labels ('easy', 'HARD ') onto DIFFICULTIES."""
+    text = str(value or '').strip().capitalize()
+    return text if text in DIFFICULTY_MIX else DEFAULT_DIFFICULTY
+
+
+def topic_key(topic):
+    return ' '.join(str(topic or '').split()).casefold()
+
+
+def cell_text(value):
+    """Text of one imported cell; only None, NaN and blank strings count as missing.
+
+    Legitimate falsy answers such as 0 are kept, and whole-number floats from
+    spreadsheets ("1945.0") are written back as integers.
+    """
+    if value is None or value != value:  # None or NaN from pandas
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def split_tags(value):
+    if value is None or value != value:  # None or NaN from pandas
+        return []
+    if isinstance(value, (list, tuple, set)):
+        items = value
+    else:
+        items = str(value).replace(';', ',').split(',')
+    return sorted({str(tag).strip().casefold() for tag in items if str(tag).strip()})
+
+
+# --- File Readers ---
+def _rows_from_csv(data):
+    text = data.decode('utf-8-sig')
+    return list(csv.DictReader(io.StringIO(text)))
+
+
+def _rows_from_jsonl(data):
+    rows = []
+    for line_no, line in enumerate(data.decode('utf-8-sig').splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise QuestionBankError(f"Line {line_no} is not valid JSON: {e}") from e
+        if not isinstance(row, dict):
+            raise QuestionBankError(f"Line {line_no} is not a JSON object.")
+        rows.append(row)
+    return rows
+
+
+def _rows_from_xlsx(data):
+    frames = pd.read_excel(io.BytesIO(data), sheet_name=None, engine='openpyxl', dtype=str)
+    rows = []
+    for df in frames.values():
+        rows.extend(df.where(df.notna(), None).to_dict('records'))
+    return rows
+
+
+READERS = {'.csv': _rows_from_csv, '.jsonl': _rows_from_jsonl, '.ndjson': _rows_from_jsonl, '.xlsx': _rows_from_xlsx}
+
+
+def read_question_rows(data, filename):
+    """Parses raw file bytes into a list of row dicts based on the file extension."""
+    ext = os.path.splitext(filename)[1].lower()
+    reader = READERS.get(ext)
+    if reader is None:
+        raise QuestionBankError(f"Unsupported file type '{ext}'. Use one of: {', '.join(sorted(READERS))}.")
+    # Header names are matched case-insensitively ("Question", "ANSWER", ...).
+    return [{str(k).strip().lower(): v for k, v in row.items() if k is not None} for row in reader(data)]
+
+
+# --- Store ---
+class QuestionBank:
+    """SQLite-backed question store with cached per-stratum id lists for fast sampling."""
+
+    def __init__(self, path=DEFAULT_BANK_PATH):
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        if path != ':memory:':
+            self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA foreign_keys=ON')
+        self._conn.executescript(SCHEMA)
+        self._strata = None
+        # Bumped on every import so derived indexes know when to rebuild.
+        self.version = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # --- Import ---
+    def import_rows(self, rows, default_topic='', default_difficulty=DEFAULT_DIFFICULTY, tags=()):
+        """Inserts or updates rows with 'question'/'answer' plus optional topic, difficulty and tags.
+
+        Returns (imported, skipped). Rows without a question or answer are skipped;
+        a question already present for the same topic is updated in place.
+        """
+        imported = skipped = 0
+        extra_tags = split_tags(tags)
+        with self._lock, self._conn:
+            for row in rows:
+                question = cell_text(row.get('question'))
+                answer = cell_text(row.get('answer'))
+                if not question or not answer:
+                    skipped += 1
+                    continue
+                topic = cell_text(row.get('topic')) or cell_text(default_topic)
+                difficulty = normalize_difficulty(row.get('difficulty') or default_difficulty)
+                key = topic_key(topic)
+                self._conn.execute(
+                    """
+                    INSERT INTO questions (question, answer, topic, topic_key, difficulty)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (topic_key, question) DO UPDATE SET
+                        answer = excluded.answer, difficulty = excluded.difficulty
+                    """,
+                    (question, answer, topic, key, difficulty),
+                )
+                question_id = self._conn.execute(
+                    'SELECT id FROM questions WHERE topic_key = ? AND question = ?', (key, question)).fetchone()[0]
+                row_tags = sorted(set(split_tags(row.get('tags'))) | set(extra_tags))
+                self._conn.executemany(
+                    'INSERT OR IGNORE INTO question_tags (question_id, tag) VALUES (?, ?)',
+                    [(question_id, tag) for tag in row_tags],
+                )
+                imported += 1
+            self._strata = None
+            self.version += 1
+        return imported, skipped
+
+    def import_file(self, data, filename, **kwargs):
+        """Reads an xlsx/CSV/JSONL file's bytes and imports it. See import_rows for kwargs."""
+        rows = read_question_rows(data, filename)
+        if rows and not {'question', 'answer'} <= set(rows[0]):
+            raise QuestionBankError("The file needs 'question' and 'answer' columns.")
+        return self.import_rows(rows, **kwargs)
+
+    # --- Queries ---
+    def _load_strata(self):
+        """Builds {(topic_key, difficulty): [ids]} once per import."""
+        strata = {}
+        for row in self._conn.execute('SELECT id, topic_key, difficulty FROM questions'):
+            strata.setdefault((row['topic_key'], row['difficulty']), []).append(row['id'])
+        self._strata = strata
+        return strata
+
+    def _pool(self, topic, difficulty, tags):
+        strata = self._strata if self._strata is not None else self._load_strata()
+        key = topic_key(topic)
+        ids = []
+        for (t_key, level), stratum in strata.items():
+            if level == difficulty and (not key or t_key == key):
+                ids.extend(stratum)
+        if tags:
+            placeholders = ','.join('?' * len(tags))
+            tagged = {row[0] for row in self._conn.execute(
+                f'SELECT question_id FROM question_tags WHERE tag IN ({placeholders})', tags)}
+            ids = [i for i in ids if i in tagged]
+        return ids
+
+    def fetch(self, ids):
+        """Returns question dicts for ids, in the given order."""
+        if not ids:
+            return []
+        placeholders = ','.join('?' * len(ids))
+        with self._lock:
+            rows = {row['id']: row for row in self._conn.execute(
+                f'SELECT id, question, answer, topic, difficulty FROM questions WHERE id IN ({placeholders})', ids)}
+            tag_rows = self._conn.execute(
+                f'SELECT question_id, tag FROM question_tags WHERE question_id IN ({placeholders})', ids).fetchall()
+        tags = {}
+        for question_id, tag in tag_rows:
+            tags.setdefault(question_id, []).append(tag)
+        return [dict(rows[i], tags=sorted(tags.get(i, []))) for i in ids if i in rows]
+
+    def sample(self, total_questions, topic='', tags=(), rng=random):
+        """Draws a shuffled quiz following the 30/40/30 mix.
+
+        When a difficulty runs short the gap is filled from the other levels, so
+        the result only falls below `total_questions` if the bank itself is too small.
+        """
+        tags = split_tags(tags)
+        with self._lock:
+            pools = {level: self._pool(topic, level, tags) for level in DIFFICULTIES}
+        chosen, leftovers = [], []
+        for level, count in difficulty_split(total_questions).items():
+            pool = pools[level]
+            picked = rng.sample(pool, min(count, len(pool)))
+            chosen.extend(picked)
+            picked_set = set(picked)
+            leftovers.extend(i for i in pool if i not in picked_set)
+        shortfall = total_questions - len(chosen)
+        if shortfall > 0 and leftovers:
+            chosen.extend(rng.sample(leftovers, min(shortfall, len(leftovers))))
+        rng.shuffle(chosen)
+        return self.fetch(chosen)
+
+    # --- Play Statistics ---
+    def record_outcome(self, question_id, stage):
+        """Adds one play to a question's stats; `stage` is the scoring timer stage or None.
+
+        Returns the updated stats row as a dict.
+        """
+        if stage not in OUTCOME_COLUMNS:
+            raise ValueError(f"Unknown outcome stage {stage!r}")
+        column = OUTCOME_COLUMNS[stage]
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"""
+                INSERT INTO question_stats (question_id, plays, {column}) VALUES (?, 1, 1)
+                ON CONFLICT (question_id) DO UPDATE SET plays = plays + 1, {column} = {column} + 1
+                """,
+                (question_id,),
+            )
+            row = self._conn.execute('SELECT * FROM question_stats WHERE question_id = ?', (question_id,)).fetchone()
+        return dict(row)
+
+    def stats_rows(self):
+        """Yields every question's id, topic key, difficulty and play counters (zeros if never played)."""
+        with self._lock:
+            return self._conn.execute(
+                """
+                SELECT q.id, q.topic_key, q.difficulty,
+                       COALESCE(s.plays, 0) AS plays, COALESCE(s.first_person, 0) AS first_person,
+                       COALESCE(s.team, 0) AS team, COALESCE(s.opposing_team, 0) AS opposing_team,
+                       COALESCE(s.unanswered, 0) AS unanswered
+                FROM questions q LEFT JOIN question_stats s ON s.question_id = q.id
+                """
+            ).fetchall()
+
+    def topics(self):
+        """Returns [(topic, {difficulty: count})] for every topic in the bank."""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT MIN(topic), topic_key, difficulty, COUNT(*) FROM questions '
+                'GROUP BY topic_key, difficulty ORDER BY topic_key').fetchall()
+        summary = {}
+        for topic, key, difficulty, count in rows:
+            summary.setdefault(key, (topic, {}))[1][difficulty] = count
+        return list(summary.values())
+
+    def count(self, topic=''):
+        key = topic_key(topic)
+        with self._lock:
+            if key:
+                return self._conn.execute('SELECT COUNT(*) FROM questions WHERE topic_key = ?', (key,)).fetchone()[0]
+            return self._conn.execute('SELECT COUNT(*) FROM questions').fetchone()[0]
@@ -0,0 +1,97 @@
+# quizzo/resources.py
+import base64
+import io
+import math
+import os
+import struct
+import wave
+from pathlib import Path
+
+import streamlit as st
+
+from quizzo.lazy import lazy_import
+
+requests = lazy_import('requests')
+# Each app uses only some of these (ScoreMaster never touches the question bank), so they load on first use.
+adaptive = lazy_import('quizzo.adaptive')
+buzzer = lazy_import('quizzo.buzzer')
+question_bank = lazy_import('quizzo.question_bank')
+
+STATIC_DIR = Path(__file__).resolve().parent / 'static'
+BUZZER_PORT = int(os.environ.get('QUIZZO_BUZZER_PORT', '8599'))
+
+
+# --- Beeper Sound Generation ---
+def generate_beep_sound():
+    """Generates a WAV beep sound in memory and returns it as a Base64 string."""
+    sample_rate = 44100
+    duration_s = 0.5
+    freq_hz = 880.0
+    n_samples = int(sample_rate * duration_s)
+    amplitude = 32767 * 0.5
+
+    wav_data = bytearray()
+    for i in range(n_samples):
+        angle = 2 * math.pi * i * freq_hz / sample_rate
+        sample = int(amplitude * math.sin(angle))
+        wav_data += struct.pack('<h', sample)
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(wav_data)
+    buffer.seek(0)
+    return base64.b64encode(buffer.read()).decode('utf-8')
+
+
+# --- Process-wide Cached Resources ---
+@st.cache_resource(show_spinner=False)
+def get_beep_wav_base64():
+    """Synthesizes the beep once per server process and shares it across sessions."""
+    return generate_beep_sound()
+
+
+@st.cache_resource(show_spinner=False)
+def get_http_session():
+    """Returns a shared requests.Session so API calls reuse pooled connections."""
+    session = requests.Session()
+    session.headers.update({'Content-Type': 'application/json'})
+    return session
+
+
+@st.cache_resource(show_spinner=False)
+def get_question_bank(path=None):
+    """Opens the local question bank once per process; its sampling caches are shared by all sessions.
+
+    `path` defaults to QUIZZO_BANK_PATH (question_bank.DEFAULT_BANK_PATH).
+    """
+    return question_bank.QuestionBank(path or question_bank.DEFAULT_BANK_PATH)
+
+
+@st.cache_resource(show_spinner=False)
+def get_adaptive_sampler(path=None):
+    """Shares one adaptive sampler (and its rate indexes) per question bank."""
+    return adaptive.AdaptiveSampler(get_question_bank(path))
+
+
+@st.cache_resource(show_spinner=False)
+def get_buzzer_server(port=BUZZER_PORT):
+    """Starts the team buzzer server once per process; each game opens its own room on it.
+
+    Raises OSError if the port is taken; that is not cached, so a later call retries.
+    """
+    return buzzer.BuzzerServer(port=port).start()
+
+
+@st.cache_resource(show_spinner=False)
+def get_stylesheet(*names):
+    """Reads and concatenates CSS files from the static folder into one <style> block."""
+    css = "\n".join((STATIC_DIR / name).read_text(encoding='utf-8') for name in names)
+    return f"<style>\n{css}\n</style>"
+
+
+def inject_styles(*names):
+    """Injects the cached stylesheet; Streamlit needs it re-emitted on every rerun."""
+    st.markdown(get_stylesheet(*names), unsafe_allow_html=True)
@@ -0,0 +1,190 @@
+# quizzo/state.py
+"""Typed, slot-based game state for the Streamlit apps.
+
+Each app keeps a single state object in st.session_state instead of ~20 loose
+keys. Assigning a tracked field bumps the version of the UI section it belongs
+to. The ticking timer runs in an st.fragment that compares section `stamp()`s,
+so only the clock redraws every second and the scoreboard, board and question
+are redrawn by a full rerun only when their version changed.
+"""
+import time
+from dataclasses import dataclass, field
+
+SECTIONS = ('scoreboard', 'board', 'question', 'timer')
+POINTS_BY_STAGE = {'first_person': 3, 'team': 2, 'opposing_team': 1}
+
+
+class VersionedState:
+    """Mixin that bumps section versions when fields listed in SECTION_OF are assigned."""
+    __slots__ = ()
+    SECTION_OF = {}
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        sections = self.SECTION_OF.get(name)
+        if sections:
+            self.touch(*sections)
+
+    def touch(self, *sections):
+        """Marks sections as changed; needed after mutating a tracked list or dict in place."""
+        versions = getattr(self, 'versions', None)
+        if versions is None:  # Still inside __init__.
+            return
+        for section in sections:
+            versions[section] += 1
+
+    def stamp(self, *sections):
+        """Current versions of `sections`; two differing stamps mean one of them changed."""
+        return tuple(self.versions[s] for s in sections)
+
+
+@dataclass(slots=True)
+class TimerState(VersionedState):
+    """Timer and stage fields shared by Quizzo and ScoreMaster."""
+    versions: dict = field(default_factory=lambda: dict.fromkeys(SECTIONS, 0), repr=False, compare=False)
+    mode: str = ''
+    timers: dict = field(default_factory=lambda: {'x': 20, 'y': 15, 'z': 10})
+    timer_running: bool = False
+    timer_value: int = 0
+    timer_start_time: float = None
+    timer_stage: str = 'off'
+    sound_played: bool = False
+    points_awarded: bool = False
+    scores: dict = field(default_factory=dict)
+
+    SECTION_OF = {
+        'timers': ('timer',),
+        'timer_running': ('timer',),
+        'timer_value': ('timer',),
+        'timer_start_time': ('timer',),
+        'timer_stage': ('timer', 'question'),
+        'sound_played': ('timer',),
+        'points_awarded': ('question',),
+        'scores': ('scoreboard',),
+    }
+
+    def __post_init__(self):
+        # Field assignments in __init__ already bumped versions; start every section at zero.
+        self.versions.update(dict.fromkeys(self.versions, 0))
+
+    @property
+    def points_to_award(self):
+        return POINTS_BY_STAGE.get(self.timer_stage, 0)
+
+    def start_timer(self, stage, duration_key):
+        self.timer_running, self.sound_played = True, False
+        self.timer_value = self.timers[duration_key]
+        self.timer_start_time = time.time()
+        self.timer_stage = stage
+
+    def stop_timer(self):
+        self.timer_running = False
+
+    def remaining(self, now=None):
+        """Seconds left on the running timer (may be negative once it has expired)."""
+        return self.timer_value - ((now or time.time()) - self.timer_start_time)
+
+    def add_points(self, team_name, points):
+        self.scores[team_name] = max(0, self.scores.get(team_name, 0) + points)
+        self.touch('scoreboard')
+
+
+@dataclass(slots=True)
+class QuizzoState(TimerState):
+    """Everything one Quizzo session needs between reruns."""
+    mode: str = 'quiz_master'
+    timers: dict = field(default_factory=lambda: {'x': 20, 'y': 15, 'z': 10})
+    questions: list = field(default_factory=list)
+    num_questions: int = 18
+    available_questions: set = field(default_factory=set)
+    current_question_index: int = None
+    show_answer: bool = False
+    quiz_topic: str = ""
+    team1_name: str = "Team A"
+    team2_name: str = "Team B"
+    scores: dict = field(default_factory=lambda: {"Team A": 0, "Team B": 0})
+    excel_file: bytes = None
+    typed_grades: dict = field(default_factory=dict)  # team -> (typed text, grading.Grade)
+
+    SECTION_OF = {
+        **TimerState.SECTION_OF,
+        'questions': ('board', 'question'),
+        'num_questions': ('board',),
+        'available_questions': ('board',),
+        'current_question_index': ('board', 'question'),
+        'show_answer': ('question',),
+        'typed_grades': ('question',),
+        'team1_name': ('scoreboard',),
+        'team2_name': ('scoreboard',),
+    }
+
+    @property
+    def team_names(self):
+        return [self.team1_name, self.team2_name]
+
+    @property
+    def current_question(self):
+        if self.current_question_index is None:
+            return None
+        return self.questions[self.current_question_index]
+
+    def load_questions(self, questions):
+        """Starts a new game with a freshly generated or sampled question list."""
+        self.questions = questions
+        self.num_questions = len(questions)
+        self.available_questions = set(range(len(questions)))
+        self.scores = {self.team1_name: 0, self.team2_name: 0}
+
+    def open_question(self, index):
+        self.current_question_index = index
+        self.show_answer = False
+        self.sound_played = False
+        self.timer_stage = 'off'
+        self.points_awarded = False
+        self.typed_grades = {}
+
+    def close_question(self):
+        self.available_questions.discard(self.current_question_index)
+        self.current_question_index = None
+        self.touch('board')
+
+
+@dataclass(slots=True)
+class ScoreMasterState(TimerState):
+    """Everything one ScoreMaster session needs between reruns."""
+    mode: str = 'setup'
+    timers: dict = field(default_factory=lambda: {'x': 20, 'y': 15, 'z': 5})
+    team_names: list = field(default_factory=lambda: ["Team A", "Team B", "Team C"])
+    scores: dict = field(default_factory=lambda: {"Team A": 0, "Team B": 0, "Team C": 0})
+    current_team_idx: int = 0
+    display_mode: str = 'quiz'  # 'quiz' or 'scores'
+    buzzers_enabled: bool = False
+    buzz_room: str = None       # this game's room id on the shared buzzer server
+    buzz_error: str = None      # why buzzers could not be turned on
+    buzz_round: int = None
+    buzz_winner: str = None
+    buzz_order: list = field(default_factory=list)
+
+    SECTION_OF = {
+        **TimerState.SECTION_OF,
+        'team_names': ('scoreboard',),
+        'current_team_idx': ('scoreboard', 'question'),
+        'display_mode': ('board',),
+        'buzz_winner': ('question',),
+    }
+
+    @property
+    def current_team(self):
+        return self.team_names[self.current_team_idx]
+
+    def next_team(self):
+        self.current_team_idx = (self.current_team_idx + 1) % len(self.team_names)
+
+    def stage_teams(self, stage=None):
+        """Teams allowed to answer in a stage: the current team, or everyone else on the 1-point steal."""
+        if (stage or self.timer_stage) == 'opposing_team':
+            return [t for i, t in enumerate(self.team_names) if i != self.current_team_idx]
+        return [self.current_team]
+
+    def clear_buzz(self):
+        self.buzz_round, self.buzz_winner, self.buzz_order = None, None, []
@@ -0,0 +1,64 @@
+# quizzo/templates.py
+"""Escaped, cached HTML fragments for the Streamlit apps.
+
+Every value that can come from a user, a spreadsheet or Gemini (question and
+answer text, team names) goes through html.escape before it reaches an
+unsafe_allow_html markdown call. Fragments are memoised process-wide, keyed on
+the values they render, so a rerun that shows the same question card or timer
+state as before reuses the finished string, and each block is emitted as a
+single element rather than open/close markdown pairs.
+"""
+import functools
+from html import escape
+
+QUESTION_CARD = (
+    '<div class="chosen-question-container"><div class="chosen-question-card">'
+    '<div class="chosen-question-text">{question}</div>{timer}</div></div>{answer}'
+)
+TIMER = '<div class="timer-label-text">{label}</div><div class="timer-value-text">{value}</div>'
+TIMER_CONTAINER = '<div class="timer-container">{timer}</div>'
+ANSWER = "<div class='chosen-answer-text'>Answer: {answer}</div>"
+TURN_BANNER = "<h3 style='text-align:center;'>Current Turn: <span style='color:#F4C430'>{turn}</span></h3>"
+TIMES_UP = """
+<div style='text-align:center; margin: 20px 0;'>
+    <span style='font-size:2rem; color:#F44336;'>⏰ Time's up!</span><br>
+    <button id='play-timer-audio-btn' style='margin-top:15px; font-size:1.2rem; background:#F4C430; color:white; border:none; border-radius:8px; padding:12px 32px; cursor:pointer;'>🔊 Play Time's Up Sound</button>
+</div>
+"""
+
+
+def timer_parts(label, remaining=None):
+    """(label, value) for a timer showing `remaining` whole seconds, or '--' when off."""
+    return label, '--' if remaining is None else f"{max(0, int(remaining))}s"
+
+
+@functools.lru_cache(maxsize=4096)
+def _escaped(text):
+    """Escapes text for HTML and folds newlines, which would otherwise end the HTML block mid-card."""
+    return escape(' '.join(str(text).split()))
+
+
+@functools.lru_cache(maxsize=1024)
+def timer(label, value):
+    return TIMER.format(label=_escaped(label), value=_escaped(value))
+
+
+@functools.lru_cache(maxsize=256)
+def timer_container(label, value):
+    """ScoreMaster's timer box: label and value inside one styled container."""
+    return TIMER_CONTAINER.format(timer=timer(label, value))
+
+
+@functools.lru_cache(maxsize=4096)
+def question_card(question, timer_label, timer_value, answer=None):
+    """Question card with its timer, plus the answer line once revealed, as one HTML block."""
+    return QUESTION_CARD.format(
+        question=_escaped(question),
+        timer=timer(timer_label, timer_value),
+        answer=ANSWER.format(answer=_escaped(answer)) if answer is not None else '',
+    )
+
+
+@functools.lru_cache(maxsize=256)
+def turn_banner(turn):
+    return TURN_BANNER.format(turn=_escaped(turn))
@@ -0,0 +1,133 @@
+import pytest
+
+from quizzo.grading import answer_variants, bounded_distance, grade, normalize
+
+
+@pytest.mark.parametrize('answer, submission', [
+    ('Paris', 'paris'),
+    ('Paris', 'Paris!'),
+    ('The Beatles', 'beatles'),
+    ('United States', 'U.S.A.'),
+    ('United States', 'USA'),
+    ('Mount Everest', 'Mt. Everest'),
+    ('Seven', '7'),
+    ('Beyoncé', 'beyonce'),
+    ("Shaquille O'Neal", 'Shaquille ONeal'),
+    ('AC/DC', 'ACDC'),
+    ('AC/DC', 'AC DC'),
+    ('24/7', '24/7'),
+    ('3.14', '3.14'),
+    ('1945', '1945'),
+    ('Paris / Lutetia', 'Lutetia'),
+    ('Mercury (planet)', 'Mercury'),
+    ('Mercury (planet)', 'Mercury planet'),
+])
+def test_normalised_match(answer, submission):
+    assert grade(answer, submission).correct
+
+
+@pytest.mark.parametrize('answer, submission', [
+    ('Photosynthesis', 'Photosynthasis'),
+    ('Leonardo da Vinci', 'Leonardo da Vinchi'),
+    ('Mississippi River', 'Misisippi River'),
+    ('Albert Einstein', 'Albert Einstien'),
+])
+def test_small_typos_accepted(answer, submission):
+    assert grade(answer, submission).correct
+
+
+@pytest.mark.parametrize('answer, submission', [
+    ('Australia', 'Austria'),
+    ('Stalactite', 'Stalagmite'),
+    ('Iraq', 'Iran'),
+    ('North Carolina', 'South Carolina'),
+    ('North America', 'South America'),
+])
+def test_near_miss_real_words_rejected(answer, submission):
+    assert not grade(answer, submission).correct
+
+
+@pytest.mark.parametrize('answer, submission', [
+    ('10000', '10001'),
+    ('1945', '1954'),
+    ('1.5', '15'),
+    ('3.14', '314'),
+    ('World War 2', 'World War 1'),
+    ('Henry VIII', 'Henry VII'),
+    ('Louis XIV', 'Louis XV'),
+])
+def test_numbers_must_match_exactly(answer, submission):
+    assert not grade(answer, submission).correct
+
+
+@pytest.mark.parametrize('answer, submission', [
+    ('AC/DC', 'AC'),
+    ('AC/DC', 'DC'),
+    ('24/7', '7'),
+    ('1/2', '1'),
+    ('1/2', '2'),
+])
+def test_unspaced_slash_is_not_an_alternative(answer, submission):
+    assert not grade(answer, submission).correct
+
+
+def test_spaced_slash_separates_alternatives():
+    assert answer_variants('Paris / Lutetia') == ['paris', 'lutetia']
+    assert answer_variants('AC/DC') == ['ac dc']
+
+
+def test_dots_only_dropped_between_letters():
+    assert normalize('U.S.') == 'united states'
+    assert normalize('1.5') == '1.5'
+    assert normalize('St. Louis') == 'saint louis'
+
+
+def test_america_is_not_the_united_states():
+    assert normalize('South America') == 'south america'
+    assert not grade('United States', 'America').correct
+
+
+@pytest.mark.parametrize('answer, submission', [
+    ('Einstein', 'Albert Einstein'),
+    ('Washington', 'Denzel Washington'),
+    ('Jupiter', 'Saturn, Jupiter'),
+])
+def test_extra_leading_words_left_to_host(answer, submission):
+    result = grade(answer, submission)
+    assert not result.correct and result.reason == 'partial'
+
+
+@pytest.mark.parametrize('answer, submission', [
+    ('Einstein', 'not Einstein'),
+    ('Einstein', 'definitely not Einstein'),
+    ('Paris', 'Rome or Paris'),
+    ('Mercury', 'Mars or Mercury'),
+    ('Paris', 'maybe Paris'),
+    ('George Washington', 'George Washington Carver'),
+    ('Einstein', 'Einstein was wrong'),
+])
+def test_hedges_negations_and_trailing_words_rejected(answer, submission):
+    result = grade(answer, submission)
+    assert not result.correct and result.reason == 'wrong'
+
+
+def test_part_of_answer_left_to_host():
+    result = grade('Albert Einstein', 'Einstein')
+    assert not result.correct and result.reason == 'partial'
+
+
+def test_blank():
+    assert grade('Paris', '   ').reason == 'blank'
+
+
+@pytest.mark.parametrize('a, b, expected', [
+    ('kitten', 'sitting', 3),
+    ('flaw', 'lawn', 2),
+    ('same', 'same', 0),
+    ('einstien', 'einstein', 1),
+    ('', 'abc', 3),
+])
+def test_bounded_distance(a, b, expected):
+    assert bounded_distance(a, b, 5) == expected
+    if expected:
+        assert bounded_distance(a, b, expected - 1) == expected  # limit + 1 once over the limit